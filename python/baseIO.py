@@ -1,6 +1,6 @@
 """
 Created:        19 October   2018
-Last Updated:   23 October   2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -9,19 +9,29 @@ daniel.edison.marley@cernSPAMNOT.ch
 Base class for interfacing with different input data types
 """
 import tools
+import fileCache
+import intervals
 import numpy as np
-from hist import Hist
+from copy import deepcopy
+from hist import Hist,fill_efficiency
 
 
 class BaseIO(object):
     def __init__(self,**kwargs):
         """Store data for plotting (collection of arrays) in a class"""
         self.dimensions = kwargs.get("dimensions",1)
-        self.rebin      = kwargs.get("rebin",False)
+        self.rebin      = kwargs.get("rebin")          # None: no re-binning (default was False, same behavior)
         self.normed     = kwargs.get("normed",False)
         self.binning    = kwargs.get("binning",1)
         self.weights    = kwargs.get("weights")
 
+        # histogramming branches of a TTree (the weight can be a branch name in 'weights')
+        self.expression = kwargs.get("expression")          # e.g., "jet_pt/1000." or ["x","y"] (2D)
+        self.selection  = kwargs.get("selection")           # e.g., "(njets>=4) & (ht>500)"
+        self.entrystart = kwargs.get("entrystart")          # first entry to read
+        self.entrystop  = kwargs.get("entrystop")           # last entry to read (exclusive)
+        self.entrysteps = kwargs.get("entrysteps",100000)   # entries read per chunk
+
         self._isHistogram  = False
         self._isEfficiency = False
 
@@ -34,9 +44,51 @@ class BaseIO(object):
         """Convert data into internal format"""
         pass
 
+    def open_file(self,path):
+        """Open a file with this backend. Done in inherited class"""
+        pass
+
+    def close_file(self,handle):
+        """Close a file opened with open_file()"""
+        pass
+
+    def get_object(self,handle,name):
+        """Access an object, e.g., "dir/hist", in an open file. Done in inherited class"""
+        pass
+
+
+    def convert_reference(self,reference):
+        """
+        Convert an object referenced as "file.root:dir/hist".
+        Files and converted histograms are kept in the process-wide fileCache.cache
+        so repeated references don't re-open files or re-read objects.
+        """
+        path,name = fileCache.split_reference(reference)
+        backend   = self.__class__.__name__
+
+        options = tuple( fileCache.option_key(o) for o in
+                         (self.dimensions,self.rebin,self.normed,self.binning,self.expression,
+                          self.selection,self.weights,self.entrystart,self.entrystop) )
+        key     = (backend,path,name,fileCache.mtime(path),options)
+
+        h_data,flags = fileCache.cache.get_hist(key)
+        if h_data is not None:
+            self._isHistogram,self._isEfficiency = flags
+            return h_data
+
+        handle = fileCache.cache.get_file(backend,path,self.open_file,self.close_file)
+        h_data = self.convert( self.get_object(handle,name) )
+
+        fileCache.cache.put_hist(key,h_data,flags=(self._isHistogram,self._isEfficiency))
+
+        return h_data
+
 
     def convert_array(self,data):
         """Convert data from an array format into internal format"""
+        if isinstance(data,Hist):
+            return self.convert_hist(data)
+
         h_data = None
         if self.dimensions==1:
             h_data = self.array2data(data,weights=self.weights,normed=self.normed,\
@@ -48,6 +100,74 @@ class BaseIO(object):
         return h_data
 
 
+    def convert_hist(self,histo):
+        """
+        Use an existing Hist (e.g., filled in chunks with Hist.fill()) for plotting.
+        The object is copied so re-binning/normalizing doesn't modify the original.
+        As for arrays, 'normed' makes a density (see Hist.density()).
+        """
+        self._isHistogram = True
+
+        results = deepcopy(histo)
+        if self.rebin is not None:
+            if results.is2D(): results.Rebin2D(self.rebin)
+            else:              results.Rebin(self.rebin)
+        if self.normed: results.density()
+
+        return results
+
+
+    def efficiency2data(self,passed,total,method='clopper_pearson',level=intervals.default_level,alpha=1.,beta=1.):
+        """
+        Efficiency of passed/total histograms (Hist objects) with asymmetric uncertainties
+        for all bins at once (see intervals.efficiency()).
+        For weighted histograms, the effective number of entries is used (as in TEfficiency).
+        """
+        self._isEfficiency = True
+
+        total_sumw2 = total.variances()
+        weighted    = not np.allclose(total_sumw2,total.content)
+        passed_n,total_n = intervals.effective_counts(passed.content,total.content,
+                                                      total_sumw2 if weighted else None)
+
+        results = Hist()
+        results.set_bins(total.bins)
+        eff,err_dn,err_up = intervals.efficiency(passed_n,total_n,method=method,level=level,alpha=alpha,beta=beta)
+        results.content = eff
+        results.error   = [err_dn,err_up]
+
+        return results
+
+
+    def array2efficiency(self,data,passed,weights=None,binning=1,reBin=None,**kwargs):
+        """
+        Efficiency of unbinned data: 'passed' is a boolean array (True for values that pass).
+        The passed & total histograms are filled in one pass over the data,
+        and re-binned with 'reBin' (if not None) before computing the efficiency.
+        @param kwargs    options of the interval (see efficiency2data())
+        Raises ValueError if 'passed' is not a boolean array with one value per entry of 'data'
+        """
+        if passed is None:
+            raise ValueError("The efficiency of unbinned values needs the boolean array 'passed'")
+        data   = np.asarray(data)
+        passed = np.asarray(passed)
+        if passed.dtype!=np.bool_ or passed.shape!=data.shape:
+            raise ValueError("'passed' must be a boolean array with one value per entry of the data "
+                             "({0} values), not {1} values of type {2}".format(data.size,passed.size,passed.dtype))
+
+        bins = tools.bin_edges(data,binning)
+
+        h_passed = Hist(bins)
+        h_total  = Hist(bins)
+        (h_passed.content,h_passed.sumw2),(h_total.content,h_total.sumw2) = fill_efficiency(data,passed,bins,weights=weights)
+
+        if reBin is not None:
+            h_passed.Rebin(reBin)
+            h_total.Rebin(reBin)
+
+        return self.efficiency2data(h_passed,h_total,**kwargs)
+
+
     def array2data(self,data,weights=None,normed=False,binning=1,reBin=None):
         """
         Convert array of data to internal format
@@ -55,23 +175,16 @@ class BaseIO(object):
         - If you pass values here from an existing histogram ('weights' is not None
           and the 'data' param is just bin centers), it is possible to re-bin
           this histogram using the 'reBin' keyword
+        - 'normed' makes a density, as numpy.histogram(...,density=True)
         """
-        data,bins = np.histogram(data,bins=binning,weights=weights,normed=normed)
+        bins = tools.bin_edges(data,binning)
 
-        results = Hist()
-        results.content = data
-        results.bins    = bins
-        results.center  = tools.midpoints(bins)
-        results.width   = tools.widths(bins)
-
-        results.error   = np.sqrt(data)
-        if weights is not None:
-            # numpy digitize to get sumw2
-            results.error = results.sumw2_1D(xdata=data,values=weights)
+        results = Hist(bins)
+        results.fill(data,weights=weights)   # contents & sumw2 in one pass
 
         if reBin is not None:
             results.Rebin(reBin)
-            if normed: results.normalize()  # normalize after re-binning
+        if normed: results.density()    # density after re-binning
 
         return results
 
@@ -83,6 +196,7 @@ class BaseIO(object):
         - If you pass values here from an existing histogram ('weights' is not None
           and the 'data' param is just bin centers), it is possible to re-bin
           this histogram using the 'reBin' keyword
+        - 'normed' makes a density, as numpy.histogram2d(...,normed=True)
         """
         try:
             x = data['x']
@@ -91,35 +205,16 @@ class BaseIO(object):
             x = data[0]
             y = data[1]
 
-        data,bins_x,bins_y = np.histogram2d(x,y,bins=binning,normed=normed,weights=weights)
-
-        results = Hist()
-        results.content = data.flatten()   # data is a ndarray (nxbins,nybins)
-        results.bins    = {'x':bins_x,'y':bins_y}
-
-        xcenter,ycenter = tools.dummy_bins2D(tools.midpoints(bins_x),tools.midpoints(bins_y))
-        xwidth,ywidth   = tools.dummy_bins2D(tools.widths(bins_x),tools.widths(bins_y))
-
-        results.center  = {'x':xcenter,'y':ycenter}
-        results.width   = {'x':xwidth, 'y':ywidth}
+        bins_x,bins_y = tools.bin_edges2D(x,y,binning)
 
-        results.error   = np.sqrt(data)
-        if weights is not None:
-            # scipy.stats to get sumw2 (x,y,weights should have the same shape)
-            results.error = results.sumw2_2D(xdata=x,ydata=y,values=weights)
+        results = Hist({'x':bins_x,'y':bins_y})
+        results.fill([x,y],weights=weights)  # contents (flattened (nxbins,nybins)) & sumw2 in one pass
 
         if reBin is not None:
             # re-binning after making data from array, likely that the user
             # passed in binned data and wants to re-bin.
             results.Rebin2D(reBin)
-            if normed: results.normalize() # normalize after re-binning
-
-        results.xbins   = results.bins['x']
-        results.ybins   = results.bins['y']
-        results.xcenter = results.center['x']
-        results.ycenter = results.center['y']
-        results.xwidth  = results.width['x']
-        results.ywidth  = results.width['y']
+        if normed: results.density()   # density after re-binning
 
         return results
 
@@ -0,0 +1,223 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Render many plots from a declarative list of plot specifications
+in a pool of processes.  Each worker loads the style and the plotting
+classes (and their backends) once and keeps its file cache across plots.
+
+A plot specification is a dictionary:
+
+  {"plotter":"Histogram1D",              # Histogram1D, Histogram2D, DataMC, Efficiency1D
+   "saveAs":"plots/jet_pt",              # output name (format from 'options' or 'pdf')
+   "options":{"backend":"uproot","x_label":"Jet p$_\\mathrm{T}$","binning":[0,100,200,500],
+              "logplot":{"y":true}},     # attributes of the plotter (dictionaries are updated)
+   "inputs":[{"data":"ttbar.root:jet_pt","name":"ttbar","label":"t$\\bar{\\mathrm{t}}$",
+              "draw_type":"step"}],      # arguments of Add() ('data' may be a list of references)
+   "ratio":[{"numerator":"ttbar","denominator":"wjets"}],   # (optional) ratio.Add() arguments
+   "text":[{"text":"Boosted","coords":[0.03,0.8]}]}         # (optional) extra_text.Add() arguments
+
+A file of specifications (JSON) is a list of these, or {"defaults":{...},"plots":[...]}
+where 'defaults' are options applied to every plot (overridden by the plot options),
+e.g., {"template":true} to re-use figures between plots with the same layout (Histogram1D).
+
+From the command line:
+  python -m batchPlotter plots.json --nworkers 32 [--text-profile fast]
+"""
+import sys
+import json
+import time
+import argparse
+import traceback
+import importlib
+import multiprocessing
+
+
+# plotter name -> (module,class)
+plotters = {'Histogram1D':('histogram1D','Histogram1D'),
+            'Histogram2D':('histogram2D','Histogram2D'),
+            'DataMC':('datamc','DataMC'),
+            'Efficiency1D':('efficiency1D','Efficiency1D')}
+
+_loaded = {}     # plotter classes loaded in this process
+
+
+
+def init_worker():
+    """Load the style and the plotting classes once per process"""
+    if 'matplotlib.pyplot' not in sys.modules:
+        import matplotlib
+        matplotlib.use('Agg')    # plots are only saved to files
+
+    import plotter
+    plotter.load_style()         # (otherwise done by the first Plotter.initialize())
+    import matplotlib.pyplot
+
+    for name,(module,klassname) in plotters.items():
+        try:
+            _loaded[name] = getattr(importlib.import_module(module),klassname)
+        except ImportError as err:
+            print " WARNING : Cannot load plotter '{0}': {1}".format(name,err)
+
+    return
+
+
+def set_options(plotter,options):
+    """Set attributes of the plotter (dictionaries, e.g., 'logplot', are updated)"""
+    for key,value in options.items():
+        current = getattr(plotter,key,None)
+        if isinstance(current,dict) and isinstance(value,dict):
+            current.update(value)
+        else:
+            setattr(plotter,key,value)
+    return
+
+
+def render(spec):
+    """
+    Make one plot from its specification (runs in a worker process).
+    Returns a dictionary with the output name, status, error message, time,
+    and the size & time to write each file
+    """
+    import matplotlib.pyplot as plt
+
+    start  = time.time()
+    result = {'saveAs':spec.get('saveAs'),'ok':True,'error':None,'files':[]}
+    try:
+        if not _loaded: init_worker()
+
+        plotter = _loaded[spec.get('plotter','Histogram1D')]()
+        set_options(plotter,spec.get('options',{}))
+        plotter.async_save = False   # workers may exit (os._exit) before a background writer is done
+        plotter.saveAs = spec['saveAs']
+        plotter.initialize()
+
+        for kwargs in spec.get('inputs',[]):
+            kwargs = dict(kwargs)
+            plotter.Add(kwargs.pop('data'),**kwargs)
+
+        for kwargs in spec.get('ratio',[]):
+            plotter.ratio.Add(**kwargs)
+
+        for kwargs in spec.get('text',[]):
+            kwargs = dict(kwargs)
+            plotter.extra_text.Add(kwargs.pop('text'),**kwargs)
+
+        plotter.execute()
+        result['files'] = plotter.savefig() or []
+    except (Exception,SystemExit):
+        # plotters exit on some configuration errors: record them and continue
+        result['ok']    = False
+        result['error'] = traceback.format_exc()
+        plt.close('all')     # (figures kept as templates are only closed after a failure)
+
+    result['time'] = time.time()-start
+
+    return result
+
+
+
+def load_specs(filename):
+    """Read a list of plot specifications from a JSON file"""
+    with open(filename) as f:
+        specs = json.load(f)
+
+    if isinstance(specs,dict):
+        defaults = specs.get('defaults',{})
+        specs    = specs.get('plots',[])
+        for spec in specs:
+            options = dict(defaults)
+            options.update(spec.get('options',{}))
+            spec['options'] = options
+
+    return specs
+
+
+def render_all(specs,nworkers=None,text_profile=None,maxtasksperchild=None):
+    """
+    Render a list of plot specifications in 'nworkers' processes.
+
+    @param specs              list of plot specifications (see the top of this file)
+    @param nworkers           number of worker processes (default: number of CPUs); 1 renders in this process
+    @param text_profile       'latex' or 'fast' for all plots (default: the plotters' setting)
+    @param maxtasksperchild   replace each worker after this many plots (limits memory growth)
+    Returns the list of results (one dictionary per plot, in the order of 'specs')
+    """
+    if nworkers is None: nworkers = multiprocessing.cpu_count()
+    nworkers = max(1,min(nworkers,len(specs)))
+
+    if text_profile is not None:
+        for spec in specs:
+            spec.setdefault('options',{})['text_profile'] = text_profile
+
+    if nworkers==1:
+        init_worker()
+        results = [render(spec) for spec in specs]
+    else:
+        pool = multiprocessing.Pool(nworkers,initializer=init_worker,
+                                    maxtasksperchild=maxtasksperchild)
+        try:
+            results = pool.map(render,specs,chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    return results
+
+
+def report(results,total_time=None):
+    """Print the failures (per plot) and a summary"""
+    failures = [r for r in results if not r['ok']]
+
+    for result in failures:
+        print " ERROR : Failed to make '{0}'".format(result['saveAs'])
+        for line in result['error'].rstrip().split('\n'):
+            print "       : {0}".format(line)
+
+    print " INFO  : Made {0} of {1} plots".format(len(results)-len(failures),len(results))
+    if failures:
+        print " INFO  : {0} plots failed".format(len(failures))
+    if total_time is not None:
+        print " INFO  : Total time {0:.1f} s ({1:.2f} s of plotting per plot)".format(total_time,
+                                  sum(r['time'] for r in results)/max(len(results),1))
+
+    files = [f for r in results for f in r.get('files',[])]
+    if files:
+        print " INFO  : Wrote {0} files ({1:.1f} MB in {2:.1f} s); largest: {3} ({4:.1f} MB)".format(len(files),
+                                  sum(f['size'] for f in files)/1048576.,sum(f['time'] for f in files),
+                                  *max( (f['size']/1048576.,f['filename']) for f in files )[::-1])
+
+    return len(failures)
+
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Render plots from a list of plot specifications (JSON).")
+    parser.add_argument('specs',nargs='+',help="JSON files with plot specifications")
+    parser.add_argument('-n','--nworkers',type=int,default=None,help="number of processes (default: number of CPUs)")
+    parser.add_argument('--text-profile',default=None,choices=['latex','fast'],help="text rendering for all plots")
+    parser.add_argument('--maxtasksperchild',type=int,default=None,help="plots per worker before it is replaced")
+    args = parser.parse_args(args)
+
+    specs = []
+    for filename in args.specs:
+        specs += load_specs(filename)
+
+    start   = time.time()
+    results = render_all(specs,nworkers=args.nworkers,text_profile=args.text_profile,
+                         maxtasksperchild=args.maxtasksperchild)
+    nfailed = report(results,total_time=time.time()-start)
+
+    return 1 if nfailed else 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+
+## THE END ##
@@ -1,6 +1,6 @@
 """
 Created:         2 August    2018
-Last Updated:    2 August    2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -9,16 +9,20 @@ Texas A&M University
 Plot comparisons between data and mc (prediction).
 """
 from math import fabs
-from copy import deepcopy
+from copy import copy
+from collections import OrderedDict
 
 from histogram1D import Histogram1D
 from plotter import PlotterData
+from hist import Hist
 import tools
+import systematics
 
-import matplotlib.pyplot as plt
-from matplotlib import gridspec
 import numpy as np
 
+plt      = tools.LazyModule('matplotlib.pyplot')
+gridspec = tools.LazyModule('matplotlib.gridspec')
+
 
 
 
@@ -30,8 +34,12 @@ class DataMC(Histogram1D):
         Histogram1D.__init__(self)
         self.stack_signal = False
         self.normed       = False
-        self.blind_data   = None    # blind data (just on/off for now -- expand!)
+        self.blind_data   = None    # blind data: None,'bool','value','significance','yield' (see make_blind())
                                     # Overrides any data/asimov you pass to hepPlotter
+        self.blind_value  = None    # threshold of the blinding mode
+        self.blind_signals = None   # signal hypotheses for blinding: names of signals, or (hypotheses x bins)
+                                    # array of signal contents (default: all signals in the plot)
+        self.blind_mask   = None    # bins that are blinded (set in execute())
         self.asimov       = False   # Draw 'asimov' data (total background)
                                     # Overrides any data you pass to hepPlotter
 
@@ -43,8 +51,16 @@ class DataMC(Histogram1D):
         self.uncertainty_band   = ['stat']  
         # list of uncertainty bands (ratio plot) to
         # individually draw:  ['stat', 'syst', 'statsyst']
+        self.uncertainty_band_main = []  # uncertainty bands to draw on the stack (main plot)
 
         self.datamc_uncertainty = {}
+        self.datamc_uncertainty_main = {'facecolor':'none','edgecolor':'#666666','hatch':'///',
+                                        'linewidth':0,'zorder':140}
+        self.background_stack   = None  # backgrounds in (samples x bins) matrices (see stack_backgrounds())
+
+        self.systematics = OrderedDict()   # background -> {nuisance:(up,down) bin contents}, see AddSystematic()
+        self.nuisances   = OrderedDict()   # nuisance -> correlated across backgrounds (True/False)
+        self.systematics_method = 'symmetrize'  # 'symmetrize' or 'envelope' (see systematics.py)
 
         return
 
@@ -75,12 +91,20 @@ class DataMC(Histogram1D):
             elif sample_type=='signal':     signal2plot.append(d2p)
 
 
+        ##  Background samples: contents & variances in (samples x bins) matrices
+        #   the stack, total prediction, and total uncertainty come from one cumulative sum
+        bckg_stack = self.stack_backgrounds(bckg2plot)
+        bckg_stack['syst'] = self.systematic_uncertainty(bckg_stack)
+        self.background_stack = bckg_stack
+
+
         ##  Data points
         if data2plot is not None:
             if self.asimov:
-                data2plot = self.make_asimov(bckg2plot)
+                data2plot = self.make_asimov(bckg_stack,bckg2plot[0].data.bins)
 
             if self.blind_data is not None:
+                self.blind_mask = self.blinding_mask(bckg_stack,signal2plot,bckg2plot[0].data.bins)
                 data2plot = self.make_blind(data2plot)
 
             data2plot.draw_type = 'errorbar'
@@ -88,64 +112,57 @@ class DataMC(Histogram1D):
             tmp_data  = self.plotErrorbar(data2plot)
             data2plot = tmp_data
         elif data2plot is None:
-            data2plot = PlotterData('data')
-            data2plot.data         = tools.Data()
-            data2plot.data.content = np.array( [np.nan for _ in bckg2plot[0].data.content] )
-
             if self.asimov:
                 # Use the total bckg to plot 'asimov' data
-                data2plot = self.make_asimov(bckg2plot)
+                data2plot = self.make_asimov(bckg_stack,bckg2plot[0].data.bins)
                 data2plot.draw_type = 'errorbar'
                 data2plot.kwargs["zorder"] = 125
                 tmp_data  = self.plotErrorbar(data2plot)
                 data2plot = tmp_data
+            else:
+                # no data points (empty data/mc ratio)
+                data2plot = PlotterData('data')
+                data2plot.draw_type    = 'errorbar'
+                data2plot.data         = Hist(bckg2plot[0].data.bins)
+                data2plot.data.content = np.full_like(bckg_stack['total'],np.nan)
+                data2plot.data.error   = np.full_like(bckg_stack['total'],np.nan)
+                data2plot.plotData     = data2plot.data.content
         self.data2plot[data2plot.name] = data2plot  # update the dictionary
 
-        ##  Background samples
-        bottom   = None                             # 'bottom' for stacking histograms
-        bckg_unc = None
         for n,hist2plot in enumerate(bckg2plot):
             hist2plot.draw_type = 'stepfilled'
             hist2plot.kwargs["zorder"] = 100+n
-            hist2plot.kwargs["bottom"] = bottom     # stack the background contributions
 
-            tmp_hist2plot = self.plotHistogram(hist2plot,uncertainty=hist2plot.uncertainty)
-            bckg2plot[n]  = tmp_hist2plot           # update data
-
-            try:
-                bottom += hist2plot.plotData.copy() # modify bottom
-            except:
-                bottom  = hist2plot.plotData.copy()
-
-            if bckg_unc is None:
-                bckg_unc  = np.square(hist2plot.data.error.copy())
-            else:
-                bckg_unc += np.square(hist2plot.data.error.copy())
+            # stack the background contributions (rows of the matrices)
+            self.plotHistogram(hist2plot,uncertainty=hist2plot.uncertainty,
+                               heights=bckg_stack['content'][n],bottom=bckg_stack['bottom'][n])
 
         # store the total background prediction and uncertainty
-        prediction = deepcopy(bckg2plot[0])       # copy attributes from bckg2plot
-        prediction.plotData     = bottom.copy()   # copy data from sum of all bckgs
-        prediction.data.content = bottom.copy()
-        prediction.data.error   = np.sqrt( bckg_unc )
+        prediction = PlotterData('total_bckg')
+        prediction.data         = Hist(bckg2plot[0].data.bins)
+        prediction.data.content = bckg_stack['total']
+        prediction.data.sumw2   = bckg_stack['total_variance']
+        prediction.data.error   = np.sqrt( bckg_stack['total_variance'] )
+        prediction.plotData     = bckg_stack['total']
         self.data2plot['total_bckg'] = prediction
 
-        for i in bckg2plot: self.data2plot[i.name] = i  # update the dictionary
+        if self.uncertainty_band_main:
+            self.drawPredictionUncertainty(axis=self.ax1,bands=self.uncertainty_band_main)
 
 
         ##  Signal distributions (designed for BSM, but could support a SM signal)
+        heights = [self.histogram_heights(hist2plot.data) for hist2plot in signal2plot]
+        bottoms = [None for _ in signal2plot]
+        if self.stack_signal and signal2plot:
+            # stack signal on top of background
+            bottoms = bckg_stack['total'] + np.cumsum([np.zeros_like(heights[0])]+heights[:-1],axis=0)
+
         for n,hist2plot in enumerate(signal2plot):
             hist2plot.draw_type = 'stepfilled' if self.stack_signal else 'step'
             hist2plot.kwargs["zorder"] = 150+n
-            hist2plot.kwargs["bottom"] = bottom if self.stack_signal else None
-
-            tmp_hist2plot  = self.plotHistogram(hist2plot,uncertainty=self.uncertainty)
-            signal2plot[n] = tmp_hist2plot         # update data
 
-            try:
-                bottom += hist2plot.plotData.copy()      # stack signal on top of background
-            except:
-                bottom  = hist2plot.plotData.copy()
-        for i in signal2plot: self.data2plot[i.name] = i # update the dictionary
+            self.plotHistogram(hist2plot,uncertainty=hist2plot.uncertainty,
+                               heights=heights[n],bottom=bottoms[n])
 
 
         ## ratio plot [data/mc (mc=total background)]
@@ -172,12 +189,128 @@ class DataMC(Histogram1D):
 
 
 
-    def drawPredictionUncertainty(self,axis=None):
+    def stack_backgrounds(self,backgrounds):
+        """
+        Put the backgrounds in (samples x bins) matrices of 'content' and 'variance'
+        and stack them with one cumulative sum:
+          'bottom' and 'top' of each sample in the stack,
+          'total' and 'total_variance' of the prediction (sum of all samples)
+        """
+        content  = np.array( [self.histogram_heights(b.data) for b in backgrounds],dtype=np.float64 )
+        variance = np.array( [b.data.variances() for b in backgrounds],dtype=np.float64 )
+
+        cumulative = np.cumsum([content,variance],axis=1)
+        top    = cumulative[0]
+        bottom = np.zeros_like(top)
+        bottom[1:] = top[:-1]
+
+        return {'names':[b.name for b in backgrounds],
+                'content':content,'variance':variance,
+                'bottom':bottom,'top':top,
+                'total':top[-1],'total_variance':cumulative[1,-1]}
+
+
+    def AddSystematic(self,sample,nuisance,up,down=None,correlated=True):
+        """
+        Add the up/down variations of a background for one nuisance.
+
+        @param sample        name of the background (as in Add())
+        @param nuisance      name of the nuisance (the same name in several backgrounds is one nuisance)
+        @param up,down       variations: arrays of bin contents (binning of the plot), Hist objects,
+                             or other inputs of Add(), e.g., "file.root:dir/hist_JESUp" references.
+                             down=None for a one-sided variation (symmetric)
+        @param correlated    add the shifts of this nuisance linearly across backgrounds (True)
+                             or in quadrature (False)
+        """
+        variations = []
+        for direction,data in [('up',up),('down',down)]:
+            if data is None:
+                variations.append(None)
+                continue
+
+            if isinstance(data,Hist):
+                data = data.content
+            elif not isinstance(data,(np.ndarray,list,tuple)) or any(isinstance(d,basestring) for d in data):
+                data,_ = self.convert(data,name='{0}_{1}_{2}'.format(sample,nuisance,direction))
+                if data is None:
+                    print " WARNING : Cannot convert the '{0}' variation of '{1}' for '{2}'".format(direction,nuisance,sample)
+                    print "         : Not adding this systematic uncertainty"
+                    return
+                data = data.content
+            variations.append( np.asarray(data,dtype=np.float64) )
+
+        if nuisance in self.nuisances and self.nuisances[nuisance]!=correlated:
+            print " WARNING : Nuisance '{0}' was added with correlated={1}".format(nuisance,self.nuisances[nuisance])
+            print "         : Keeping correlated={0}".format(self.nuisances[nuisance])
+        self.nuisances.setdefault(nuisance,correlated)
+
+        self.systematics.setdefault(sample,OrderedDict())[nuisance] = tuple(variations)
+
+        return
+
+
+    def AddSystematics(self,sample,pattern,nuisances,directions=('Up','Down'),correlated=True):
+        """
+        Add the variations of a background for many nuisances, from references built with a pattern:
+          hist.AddSystematics('ttbar',"ttbar.root:h_pt_{nuisance}{direction}",['JES','JER'])
+        ('{sample}' is replaced with the name of the background).
+        Use directions=('Up',None) for one-sided variations.
+        """
+        for nuisance in nuisances:
+            up,down = [pattern.format(sample=sample,nuisance=nuisance,direction=d) if d is not None else None
+                       for d in directions]
+            self.AddSystematic(sample,nuisance,up,down,correlated=correlated)
+
+        return
+
+
+    def systematic_uncertainty(self,bckg_stack):
+        """
+        Systematic uncertainty (down,up) of the total background in each bin,
+        from the variations of all backgrounds in one pass (see systematics.py)
+        """
+        nominal   = bckg_stack['content']
+        names     = bckg_stack['names']
+        nuisances = list(self.nuisances.keys())
+
+        for name in self.systematics:
+            if name not in names:
+                print " WARNING : Systematic uncertainties of '{0}' are not used (not a background)".format(name)
+
+        if not nuisances:
+            zeros = np.zeros_like(bckg_stack['total'])
+            return zeros,zeros
+
+        # (samples x nuisances x bins) shifts from the nominal (0 for samples without a variation)
+        index = dict( (nuisance,i) for i,nuisance in enumerate(nuisances) )
+        shift_up   = np.zeros( (len(names),len(nuisances),nominal.shape[1]) )
+        shift_down = np.zeros_like(shift_up)
+
+        for s,name in enumerate(names):
+            for nuisance,(up,down) in self.systematics.get(name,{}).items():
+                if up.shape!=nominal[s].shape or (down is not None and down.shape!=nominal[s].shape):
+                    print " WARNING : Variation '{0}' of '{1}' does not have the binning of the plot".format(nuisance,name)
+                    print "         : Not using this systematic uncertainty"
+                    continue
+
+                n = index[nuisance]
+                shift_up[s,n]   = up - nominal[s]
+                shift_down[s,n] = down - nominal[s] if down is not None else -shift_up[s,n]
+
+        return systematics.uncertainty(shift_up,shift_down,
+                                       correlated=[self.nuisances[n] for n in nuisances],
+                                       method=self.systematics_method)
+
+
+    def drawPredictionUncertainty(self,axis=None,bands=None):
         """
         Draw the uncertainty on the prediction.
         By default assume this is done on the smaller ratio plot (author's style).
+
+        @param bands    uncertainty bands to draw (default: self.uncertainty_band)
         """
-        hist = deepcopy(self.data2plot['total_bckg'])
+        prediction = self.data2plot['total_bckg']
+        if bands is None: bands = self.uncertainty_band
 
         uncertainty_band = {'alpha':1,'zorder':10}
 
@@ -185,42 +318,111 @@ class DataMC(Histogram1D):
             axis = self.ax2
             uncertainty_band['normalize'] = True
 
-        # include user options in uncertainty band drawing properties
-        uncertainty_band.update(self.datamc_uncertainty)
+            # include user options in uncertainty band drawing properties
+            uncertainty_band.update(self.datamc_uncertainty)
+        else:
+            uncertainty_band.update(self.datamc_uncertainty_main)
 
-        # loop over possible uncertainty bands
-        # e.g., may want to plot 'stat' and 'statsyst' at the same time
-        for band in self.uncertainty_band:
-            fc = uncertainty_band.get('facecolor',self.uncertainty_colors[band])
-            uncertainty_band['facecolor'] = fc
+        # (down,up) uncertainty of each band
+        stat = prediction.data.error
+        syst_dn,syst_up = self.background_stack['syst']
+        band_errors = {'stat':stat,
+                       'syst':np.array([syst_dn,syst_up]),
+                       'statsyst':np.sqrt(np.square(stat)+np.square([syst_dn,syst_up]))}
 
-            self.plotUncertainty(hist,axis,**uncertainty_band)
+        # loop over possible uncertainty bands
+        # e.g., may want to plot 'stat' and 'statsyst' at the same time (widest band first)
+        order = ['statsyst','syst','stat']
+        for band in sorted(bands,key=lambda b: order.index(b) if b in order else -1):
+            if band not in band_errors:
+                print " WARNING : Unsupported uncertainty band '{0}' ({1})".format(band,', '.join(order))
+                continue
+
+            band_kwargs = dict(uncertainty_band)
+            band_kwargs.setdefault('facecolor',self.uncertainty_colors[band])
+
+            hist = copy(prediction)      # plotUncertainty() modifies the kwargs (not the data)
+            hist.kwargs = {}
+            hist.data   = copy(prediction.data)
+            hist.data.error = band_errors[band]
+            self.plotUncertainty(hist,axis,**band_kwargs)
 
         return
 
 
-    def make_asimov(self,backgrounds):
-        """Calculate asimov (pseudo-data) from backgrounds"""
-        pseudo      = sum( [x.data.content for x in backgrounds] )
+    def make_asimov(self,bckg_stack,bins):
+        """Calculate asimov (pseudo-data) from the total background (see stack_backgrounds())"""
         asimov_data = PlotterData('data')
-        asimov_data.data = deepcopy(backgrounds[0].data)  # copy attributes of background
-        asimov_data.data.content = pseudo
-        asimov_data.data.error   = np.array( [np.sqrt(i) for i in pseudo] )
+        asimov_data.data = Hist(bins)
+        asimov_data.data.content = bckg_stack['total'].copy()
+        asimov_data.data.sumw2   = bckg_stack['total'].copy()
+        asimov_data.data.error   = np.sqrt(bckg_stack['total'])
         return asimov_data
 
 
-    def make_blind(self,data):
+    def blinding_mask(self,bckg_stack,signals,bins):
+        """
+        Bins to blind (boolean array), from the total background and the signal hypotheses:
+        a bin is blinded if any hypothesis passes the threshold (see make_blind())
+        """
+        total = bckg_stack['total']
+        mode  = self.blind_data
+        value = self.blind_value
+
+        if mode=='bool':
+            return np.ones(total.shape,dtype=bool)
+
+        if mode not in ['value','significance','yield']:
+            print " WARNING : Unsupported blinding mode '{0}' ('bool','value','significance','yield')".format(mode)
+            print "         : Not blinding the data"
+            return np.zeros(total.shape,dtype=bool)
+        elif value is None:
+            print " WARNING : Blinding mode '{0}' needs a threshold (blind_value)".format(mode)
+            print "         : Not blinding the data"
+            return np.zeros(total.shape,dtype=bool)
+
+        if mode=='value':
+            return np.asarray(bins[1:])>value            # any part of the bin above the cut
+
+        # (hypotheses x bins) signal contents
+        hypotheses = self.blind_signals
+        if hypotheses is None:
+            hypotheses = [s.data.content for s in signals]
+        elif all(isinstance(h,basestring) for h in hypotheses):
+            hypotheses = [self.data2plot[h].data.content for h in hypotheses]
+        signal = np.asarray(hypotheses,dtype=np.float64).reshape(-1,total.size)
+
+        with np.errstate(divide='ignore',invalid='ignore'):
+            if mode=='significance':
+                metric = signal / np.sqrt(total)       # s/sqrt(b) (inf without background)
+            else:
+                metric = 100. * signal / (signal+total) # % contribution of the signal
+        metric = np.where(signal>0,metric,0)
+
+        return np.any(metric>value,axis=0)
+
+
+    def make_blind(self,data,mask=None):
         """
-        Blind the data distribution in the plots.
+        Blind the data distribution in the plots (and the data/mc ratio).
+        The bins are chosen with one mask for all signal hypotheses (see blinding_mask()):
         
         - Simple boolean ON/OFF    : mode = 'bool'
         - Value cut                : mode = 'value';        value = x>cut
         - Signficance cut          : mode = 'significance'; value = <significance>
+          (s/sqrt(b) of any signal hypothesis)
         - % contribution in a bin  : mode = 'yield';        value = <percent_yield>
+          (100*s/(s+b) of any signal hypothesis)
         """
-        if self.blind_data=='bool':
-            # mask all data points
-            data.data.content = np.array( [np.nan for _ in data.data.content] )
+        if mask is None: mask = self.blind_mask
+        if mask is None: return data
+
+        # new arrays: the data may be shared (e.g., histograms in the file cache)
+        data.data = copy(data.data)
+        data.data.content = np.where(mask,np.nan,data.data.content)
+        data.data.error   = np.where(mask,np.nan,data.data.error)
+        if data.data.sumw2 is not None:
+            data.data.sumw2 = np.where(mask,np.nan,data.data.sumw2)
 
         return data
 
@@ -1,6 +1,6 @@
 """
 Created:         6 April     2016
-Last Updated:   13 July      2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -12,6 +12,8 @@ University of Michigan, Ann Arbor, MI 48109
 -----
 
 Class to plot basic 1D TEfficiency curves & histograms.
+Efficiencies can also be computed without ROOT from passed/total histograms
+or unbinned values with a pass mask (see AddEfficiency()).
 
 This does not include an interface to load/access data.
 Here we just plot the 1D data we're given.
@@ -20,11 +22,16 @@ from math import fabs
 from copy import deepcopy
 
 from histogram1D import Histogram1D
+from plotter import PlotterData
+from baseIO import BaseIO
+import intervals
+import tools
 
-import matplotlib.pyplot as plt
-from matplotlib import gridspec
 import numpy as np
 
+plt      = tools.LazyModule('matplotlib.pyplot')
+gridspec = tools.LazyModule('matplotlib.gridspec')
+
 
 
 class Efficiency1D(Histogram1D):
@@ -34,6 +41,44 @@ class Efficiency1D(Histogram1D):
         return
 
 
+    def AddEfficiency(self,name='',passed=None,total=None,values=None,weights=None,
+                      method='clopper_pearson',level=intervals.default_level,**kwargs):
+        """
+        Add an efficiency computed from histograms or unbinned data (no ROOT TEfficiency needed).
+
+        @param name       name to identify the efficiency
+        @param passed     histogram of the events that pass, and
+        @param total      histogram of all events: Hist objects or other histogram inputs of Add(),
+                          e.g., uproot histograms or "file.root:h_total" references
+        @param values     (instead of 'total') unbinned values of all events, binned with self.binning;
+                          'passed' is then a boolean array (True for events that pass);
+                          raises ValueError if it is not a boolean array of the same length
+        @param weights    (optional) weights of the unbinned values
+        @param method     interval: 'clopper_pearson','wilson','jeffreys','normal',... (see intervals.py)
+        @param level      confidence level of the interval
+        @param kwargs     arguments for matplotlib options (as in Add())
+        """
+        hist = PlotterData(name)
+        self.setParameters(hist,**kwargs)     # set parameters based on kwargs
+
+        io = BaseIO(dimensions=self.dimensions,binning=self.binning,rebin=self.rebin)
+        if values is not None:
+            hist.data = io.array2efficiency(values,passed,weights=weights,binning=self.binning,
+                                            reBin=self.rebin,method=method,level=level)
+        else:
+            h_passed,_ = self.convert(passed,name=name+' (passed)')
+            h_total,_  = self.convert(total, name=name+' (total)')
+            if h_passed is None or h_total is None:
+                print " ERROR : Cannot compute the efficiency '{0}'".format(name)
+                return
+            hist.data = io.efficiency2data(h_passed,h_total,method=method,level=level)
+
+        hist.isTEff = True
+        self.data2plot[name] = hist   # store in this in a dictionary
+
+        return
+
+
     def execute(self):
         """
         Make the plot!
@@ -84,34 +129,36 @@ class Efficiency1D(Histogram1D):
             if self.normed or bar2plot.normed:
                 bar2plot.normed = True
 
-                h_data  = bar2plot.data
-                og_data = h_data.content.copy()
-                data,be = np.histogram(h_data.center,bins=h_data.bins,
-                                       weights=og_data,density=True)
-                error = h_data.error * (data/og_data)  # scale error bars
-                bar2plot.data.content = data
-                bar2plot.data.error   = error
+            h_data = bar2plot.data
+            if bar2plot.normed and not h_data.isDensity:   # arrays are already a density
+                factor = tools.density_factor(h_data.content,h_data.bins)
+                bar2plot.data.content = h_data.content*factor
+                bar2plot.data.error   = [e*factor for e in h_data.error] if isinstance(h_data.error,list) \
+                                        else h_data.error*factor   # scale error bars
 
             tmp_barplot  = self.plotErrorbar(bar2plot)
             bars2plot[n] = tmp_barplot            # update data
 
 
         ##  Histograms (should be in background: start with zorder 100)
-        bottom = None                             # 'bottom' for stacking histograms
-        for n,hist2plot in enumerate(hists2plot):
-            hist2plot.kwargs["zorder"] = 100+n
-            hist2plot.kwargs["bottom"] = bottom if self.stacked else None
-
+        #   heights (normalized, if requested) and 'bottom' for stacking are computed up front
+        heights = []
+        for hist2plot in hists2plot:
             # if global value for 'normed' is True, override object setting
             if self.normed or hist2plot.normed:
                 hist2plot.normed = True
-                hist2plot.kwargs["density"] = True
+            heights.append( self.histogram_heights(hist2plot.data,normed=hist2plot.normed) )
 
-            tmp_hist2plot = self.plotHistogram(hist2plot,uncertainty=self.drawUncertaintyMain)
-            hists2plot[n] = tmp_hist2plot         # update data
+        bottoms = [None for _ in hists2plot]
+        if self.stacked and hists2plot:
+            bottoms = np.cumsum([np.zeros_like(heights[0])]+heights[:-1],axis=0)
+
+        for n,hist2plot in enumerate(hists2plot):
+            hist2plot.kwargs["zorder"] = 100+n
 
-            if n==0: bottom  = hist2plot.plotData.copy() # modify 'bottom' for stacked plots
-            else:    bottom += hist2plot.plotData.copy()
+            tmp_hist2plot = self.plotHistogram(hist2plot,uncertainty=hist2plot.uncertainty,
+                                               heights=heights[n],bottom=bottoms[n])
+            hists2plot[n] = tmp_hist2plot         # update data
 
 
         ##  Physics distributions
@@ -152,20 +199,21 @@ class Efficiency1D(Histogram1D):
         axis_twin = axis.twinx()
 
         ## Draw the histogram
-        for n,data in enumerate(data2plot):
+        #  'bottom' for stacking histograms (also records the height of plotted data)
+        heights = [np.asarray(data.data.content,dtype=np.float64) for data in data2plot]
+        bottoms = np.cumsum([np.zeros_like(heights[0])]+heights[:-1],axis=0)
+        bottom  = bottoms[-1]+heights[-1]
 
-            bottom = None                        # 'bottom' for stacking histograms
+        for n,data in enumerate(data2plot):
             if data.isErrorbar:
                 data.kwargs["zorder"] = 70+n     # draw behind efficiency curves
                 tmp_dataplot = self.plotErrorbar(data,axis=axis_twin)
             elif data.isHistogram:
                 data.kwargs["zorder"] = 50+n
-                data.kwargs["bottom"] = bottom if self.stacked else None
-                tmp_dataplot = self.plotHistogram(data,axis=axis_twin)
+                tmp_dataplot = self.plotHistogram(data,axis=axis_twin,heights=heights[n],
+                                                  bottom=bottoms[n] if self.stacked else None)
 
             data2plot[n] = tmp_dataplot
-            if n==0: bottom  = data.plotData      # modify 'bottom' for stacked plots
-            else:    bottom += data.plotData      # this also records the height of plotted data
 
         axis_twin.yaxis.set_tick_params(which='major', length=8)
         axis_twin.set_ylabel("",fontsize=0,ha='right',va='top')
@@ -0,0 +1,246 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Save figures in several formats, and (optionally) encode & write them
+in separate processes while the next plot is made.
+Data-heavy artists (large 2D maps, dense uncertainty bands or error bars) can be
+rasterized in vector files, while the axes, labels, and text stay vector.
+
+  save(fig,['plot.pdf','plot.png'])       # one figure, several files
+  save(fig,{'plot.pdf':{},'plot.png':{'dpi':72}},verbose=True)   # prints size & time of each file
+  rasterize(fig,max_vertices=20000,max_artists=1000)             # before saving vector files
+  writer().submit(fig,['plot.pdf'])       # returns once the figure is sent to a writer process
+  wait()                                  # blocks until all files are written;
+                                          # raises the first error of the writers
+
+matplotlib is not thread-safe (fonts, rcParams, renderers are shared), so the
+writer uses processes: each figure is pickled, with the rcParams it was made with,
+and saved in a writer process.  At most FigureWriter.maxsize figures are pending:
+submit() blocks when there are more, so figures don't accumulate in memory.
+Files still pending are written at exit, except in processes that end with
+os._exit() (e.g., multiprocessing workers): call wait() before these return.
+"""
+import os
+import time
+import atexit
+import cPickle as pickle
+import traceback
+import multiprocessing
+from collections import OrderedDict,deque
+
+import tools
+
+mpl = tools.LazyModule('matplotlib')
+
+vector_formats = ('pdf','ps','eps','svg','svgz','pgf')
+
+
+
+def count_vertices(artist):
+    """Number of vertices (points) drawn by an artist"""
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+
+    coordinates = getattr(artist,'_coordinates',None)   # QuadMesh (pcolormesh)
+    if coordinates is not None:
+        return coordinates.size//2
+
+    if isinstance(artist,Line2D):
+        return len(artist.get_xydata())
+    elif isinstance(artist,Patch):
+        return len(artist.get_path().vertices)
+    elif isinstance(artist,Collection):
+        paths     = artist.get_paths()
+        nvertices = sum(len(path.vertices) for path in paths)
+        noffsets  = len(artist.get_offsets())
+        if 0<len(paths)<noffsets:
+            nvertices = nvertices*noffsets//len(paths)   # markers drawn at each offset
+        return nvertices
+
+    return 0
+
+
+def rasterize(fig,max_vertices=20000,max_artists=1000):
+    """
+    Rasterize the data-heavy artists (lines, patches, collections) in the axes of 'fig':
+    artists with more than 'max_vertices' vertices, or all of them in axes with more
+    than 'max_artists' artists.  Axes, legends, and text (incl. artists with gid 'text') stay vector.
+    The resolution is the 'dpi' of savefig.  Returns the number of rasterized artists
+    """
+    nrasterized = 0
+    for axis in fig.axes:
+        artists = [a for a in axis.lines+axis.collections+axis.patches
+                   if a.get_visible() and a.get_gid()!='text' and not a.get_rasterized()]
+
+        if len(artists)<=max_artists:
+            artists = [a for a in artists if count_vertices(a)>max_vertices]
+
+        for artist in artists:
+            artist.set_rasterized(True)
+        nrasterized += len(artists)
+
+    return nrasterized
+
+
+def save(fig,filenames,verbose=False,**kwargs):
+    """
+    Save 'fig' to each file in 'filenames' (format from the extension).
+    'filenames' can be a dictionary of {filename:{savefig arguments for this file}}.
+    Returns the size (bytes) and time (s) to write each file; 'verbose' prints them
+    """
+    if isinstance(filenames,basestring): filenames = [filenames]
+    if not isinstance(filenames,dict):   filenames = OrderedDict( (f,{}) for f in filenames )
+
+    stats = []
+    for filename,file_kwargs in filenames.items():
+        start = time.time()
+        savefig_kwargs = dict(kwargs)
+        savefig_kwargs.update(file_kwargs)
+        fig.savefig(filename,**savefig_kwargs)
+
+        stats.append( {'filename':filename,'size':os.path.getsize(filename),'time':time.time()-start} )
+
+        if verbose:
+            print " INFO  : Saved {0} ({1:.1f} kB in {2:.2f} s)".format(filename,stats[-1]['size']/1024.,stats[-1]['time'])
+
+    return stats
+
+
+
+def init_writer():
+    """Writer processes only save figures to files"""
+    mpl.use('Agg',warn=False)
+    return
+
+
+def save_pickled(data,rc_params,filenames,kwargs):
+    """
+    Save a pickled figure with the rcParams it was made with (runs in a writer process).
+    Returns (stats,None), or (None,(error,traceback)) if the figure can't be saved
+    """
+    import matplotlib.pyplot as plt
+
+    dict.update(mpl.rcParams,rc_params)     # values were validated in the main process
+    fig = None
+    try:
+        fig = pickle.loads(data)
+        if fig.canvas is None:            # figures closed in pyplot before they were sent
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            FigureCanvasAgg(fig)
+        return save(fig,filenames,**kwargs),None
+    except Exception as err:
+        return None,(err,traceback.format_exc())
+    finally:
+        if fig is not None: plt.close(fig)
+
+
+
+class FigureWriter(object):
+    """Processes that save pickled figures, with a bounded number of pending figures"""
+    def __init__(self,nprocesses=1,maxsize=4):
+        """
+        @param nprocesses  number of processes writing figures
+        @param maxsize     number of pending figures before submit() blocks
+        """
+        self.nprocesses = nprocesses
+        self.maxsize    = maxsize
+        self.pending    = deque()     # (filenames, AsyncResult) in the order of submission
+        self.errors     = []          # (filenames, (error,traceback)) of failed figures
+        self.pool       = multiprocessing.Pool(nprocesses,initializer=init_writer)
+
+        return
+
+    def collect(self,block=True):
+        """Collect the results of the oldest pending figure (if it is done, or 'block')"""
+        if not self.pending: return False
+        filenames,result = self.pending[0]
+        if not block and not result.ready(): return False
+
+        self.pending.popleft()
+        try:
+            stats,error = result.get()
+        except Exception as err:      # e.g., the figure could not be sent to the writer
+            stats,error = None,(err,traceback.format_exc())
+        if error is not None:
+            self.errors.append( (filenames,error) )
+
+        return True
+
+    def submit(self,fig,filenames,**kwargs):
+        """Send a figure to a writer process (blocks if too many are pending). Raises earlier errors"""
+        while self.collect(block=False): pass
+        self.check()
+        while len(self.pending)>=self.maxsize:
+            self.collect(block=True)
+
+        if isinstance(filenames,basestring): filenames = [filenames]
+        data   = pickle.dumps(fig,pickle.HIGHEST_PROTOCOL)
+        result = self.pool.apply_async(save_pickled,(data,mpl.rcParams.copy(),filenames,kwargs))
+        self.pending.append( (filenames,result) )
+
+        return
+
+    def wait(self):
+        """Block until all pending figures are saved. Raises the first error"""
+        while self.collect(block=True): pass
+        self.check()
+        return
+
+    def close(self):
+        """Save the pending figures and stop the processes. Raises the first error"""
+        try:
+            self.wait()
+        finally:
+            self.pool.close()
+            self.pool.join()
+        return
+
+    def check(self):
+        """Raise the first error of the writers (other failures are printed)"""
+        errors,self.errors = self.errors,[]
+        if not errors: return
+
+        for filenames,(err,_) in errors[1:]:
+            print " ERROR : Failed to save {0}: {1}".format(', '.join(filenames),err)
+
+        filenames,(err,tb) = errors[0]
+        print " ERROR : Failed to save {0}".format(', '.join(filenames))
+        print tb
+        raise err
+
+
+
+_writer = None
+
+def writer(nprocesses=1,maxsize=4):
+    """The writer of this process (created on first use)"""
+    global _writer
+    if _writer is None:
+        _writer = FigureWriter(nprocesses=nprocesses,maxsize=maxsize)
+        atexit.register(close)
+    return _writer
+
+
+def wait():
+    """Block until all figures submitted in this process are saved. Raises the first error"""
+    if _writer is not None:
+        _writer.wait()
+    return
+
+
+def close():
+    """Save the figures submitted in this process and stop the writer. Raises the first error"""
+    global _writer
+    if _writer is not None:
+        writer,_writer = _writer,None
+        writer.close()
+    return
+
+
+## THE END ##
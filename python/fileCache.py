@@ -0,0 +1,166 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Process-wide cache of open files and converted histograms shared by the
+ROOT and uproot backends.
+
+Objects are referenced as "file.root:dir/hist".  Open file handles are kept
+(up to 'max_files') and converted Hist objects are kept (up to 'max_memory'
+bytes), both with least-recently-used eviction.  Entries are keyed by the
+file path, object name, and the modification time of the file, so a file
+that changes on disk is re-read, and by the conversion options (arrays,
+e.g., weights or bin edges, by a digest of their contents).
+"""
+import os
+import hashlib
+from copy import deepcopy
+from collections import OrderedDict
+
+import numpy as np
+
+
+
+def split_reference(reference):
+    """Split "file.root:dir/hist" into ("file.root","dir/hist")"""
+    try:
+        path,name = reference.rsplit(':',1)
+    except ValueError:
+        path,name = reference,''
+
+    if not path or not name or name.startswith('/'):
+        # e.g., "root://host//file.root" without an object name
+        print " WARNING : Cannot find object name in '{0}'".format(reference)
+        print "         : Use the format 'file.root:dir/hist'"
+        return reference,''
+
+    return path,name
+
+
+def mtime(path):
+    """Modification time of a local file (None for remote files, e.g., root://)"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def option_key(value):
+    """Hashable key of a conversion option: arrays are keyed by a digest of their contents"""
+    if value is None or isinstance(value,(basestring,int,long,float,bool)):
+        return value
+    if isinstance(value,dict):
+        return tuple( (k,option_key(value[k])) for k in sorted(value) )
+
+    array = np.asarray(value)
+    if array.dtype==object:
+        return tuple(option_key(v) for v in value)      # e.g., [xedges,yedges]
+
+    array = np.ascontiguousarray(array)
+    return (array.dtype.str,array.shape,hashlib.sha1(array.tobytes()).hexdigest())
+
+
+def hist_nbytes(histo):
+    """Approximate memory used by the arrays of a Hist object"""
+    nbytes = 0
+    for value in histo.__dict__.values():
+        values = value.values() if isinstance(value,dict) else value
+        if isinstance(values,(list,tuple)):
+            nbytes += sum(np.asarray(v).nbytes for v in values)
+        elif values is not None:
+            nbytes += np.asarray(values).nbytes
+    return nbytes
+
+
+
+class FileCache(object):
+    """LRU cache of open file handles and converted histograms"""
+    def __init__(self,max_files=32,max_memory=512*1024**2):
+        self.max_files  = max_files     # number of open file handles to keep
+        self.max_memory = max_memory    # bytes of converted histograms to keep
+        self.memory     = 0
+
+        self.files = OrderedDict()      # (backend,path) -> (mtime,handle,close)
+        self.hists = OrderedDict()      # (backend,path,name,mtime,options) -> (Hist,flags,nbytes)
+
+        self.hits   = 0
+        self.misses = 0
+
+
+    def get_file(self,backend,path,open_file,close_file=None):
+        """
+        Return an open handle for 'path', opening it with 'open_file(path)' if needed.
+        Handles are re-opened if the file changed on disk since it was opened.
+        """
+        key  = (backend,path)
+        time = mtime(path)
+
+        if key in self.files:
+            file_time,handle,close = self.files.pop(key)
+            if file_time==time:
+                self.files[key] = (file_time,handle,close)   # most recently used
+                return handle
+            if close is not None: close(handle)
+
+        handle = open_file(path)
+        self.files[key] = (time,handle,close_file)
+
+        while len(self.files)>self.max_files:
+            _,(file_time,old_handle,close) = self.files.popitem(last=False)
+            if close is not None: close(old_handle)
+
+        return handle
+
+
+    def get_hist(self,key):
+        """Return a copy of the cached Hist and its flags (None,None if not cached)"""
+        try:
+            histo,flags,nbytes = self.hists.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None,None
+
+        self.hists[key] = (histo,flags,nbytes)    # most recently used
+        self.hits += 1
+
+        return deepcopy(histo),flags
+
+
+    def put_hist(self,key,histo,flags=None):
+        """Store a copy of a converted Hist (plotters modify the objects they draw)"""
+        nbytes = hist_nbytes(histo)
+        if nbytes>self.max_memory: return
+
+        if key in self.hists:
+            self.memory -= self.hists.pop(key)[2]
+
+        self.hists[key] = (deepcopy(histo),flags,nbytes)
+        self.memory += nbytes
+
+        while self.memory>self.max_memory:
+            _,(old_histo,old_flags,old_nbytes) = self.hists.popitem(last=False)
+            self.memory -= old_nbytes
+
+        return
+
+
+    def clear(self):
+        """Close all files and drop all histograms"""
+        for file_time,handle,close in self.files.values():
+            if close is not None: close(handle)
+        self.files.clear()
+        self.hists.clear()
+        self.memory = 0
+
+        return
+
+
+
+cache = FileCache()    # shared by all backends in this process
+
+
+## THE END ##
@@ -1,6 +1,6 @@
 """
 Created:        19 October   2018
-Last Updated:   19 October   2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -9,25 +9,169 @@ daniel.edison.marley@cernSPAMNOT.ch
 Simple class for storing data internally to HEP Plotter as histogram-like object
 """
 import numpy as np
+from itertools import izip
+
 import tools
 
-_scipy_available = False  # for re-binning 2D histograms
 
-try:
-    import scipy.stats
-    _scipy_available = True
-except ImportError:
-    _scipy_available = False
 
 
+def binning_scheme(bins,rtol=1e-6):
+    """
+    Check if bin edges are uniform or log-uniform (equal widths in log(x)).
+    Returns (lower edge, 1/width, is_log) for arithmetic bin look-up, or None.
+    """
+    bins = np.asarray(bins,dtype=np.float64)
+    if bins.size<2: return None
+
+    widths = np.diff(bins)
+    if widths[0]>0 and np.allclose(widths,widths[0],rtol=rtol,atol=0):
+        return bins[0],(bins.size-1)/(bins[-1]-bins[0]),False
+
+    if bins[0]>0:
+        log_bins   = np.log(bins)
+        log_widths = np.diff(log_bins)
+        if log_widths[0]>0 and np.allclose(log_widths,log_widths[0],rtol=rtol,atol=0):
+            return log_bins[0],(bins.size-1)/(log_bins[-1]-log_bins[0]),True
+
+    return None
+
+
+def bin_index(data,bins,scheme=False):
+    """
+    Return the bin index of each value and a mask of the values inside the binning.
+    The last bin includes its upper edge (same convention as numpy.histogram).
+
+    For uniform (or log-uniform) binning the index is computed arithmetically,
+    (x-lo)*inv_width, and then corrected by one bin where rounding put a value
+    on the wrong side of an edge.  Otherwise, the edges are searched.
+    @param scheme    result of binning_scheme(bins) if already known
+    """
+    data  = np.asarray(data)
+    bins  = np.asarray(bins,dtype=np.float64)
+    nbins = len(bins)-1
+    if scheme is False: scheme = binning_scheme(bins)
+
+    if scheme is None:
+        index = np.searchsorted(bins,data,side='right')-1
+    else:
+        lo,inv_width,is_log = scheme
+        with np.errstate(invalid='ignore',divide='ignore'):
+            values = np.log(data) if is_log else data
+            index  = (values-lo)*inv_width
+            np.floor(index,out=index)
+            np.fmax(index,0,out=index)                 # fmax/fmin also map NaN into range
+            np.fmin(index,nbins-1,out=index)
+            index  = index.astype(np.intp)
+            index += (data>=bins[index+1])             # rounding corrections & overflow
+            index -= (data<bins[np.minimum(index,nbins-1)]) # ... & underflow
+        index[np.isnan(data)] = nbins
+
+    index[data==bins[-1]] = nbins-1
+    inside = (index>=0) & (index<nbins)
+
+    return index,inside
+
+
+def accumulate(index,inside,nbins,weights=None):
+    """Sum the weights and weights squared of each bin with bincount"""
+    index = index[inside]
+
+    if weights is None:
+        content = np.bincount(index,minlength=nbins).astype(np.float64)
+        sumw2   = content.copy()
+    else:
+        weights = np.asarray(weights,dtype=np.float64).ravel()[inside]
+        content = np.bincount(index,weights=weights,minlength=nbins)
+        sumw2   = np.bincount(index,weights=np.square(weights),minlength=nbins)
+
+    return content,sumw2
+
+
+def fill1D(data,bins,weights=None):
+    """Fill the bin contents and sum of weights squared in one pass over the data"""
+    index,inside = bin_index(data,bins)
+    return accumulate(index,inside,len(bins)-1,weights=weights)
+
+
+def fill_efficiency(data,passed,bins,weights=None):
+    """
+    Fill the passed & total histograms of an efficiency in one pass over the data.
+    @param passed    boolean array: True for values that pass the selection
+    Returns (content,sumw2) of the passed and (content,sumw2) of the total histogram
+    """
+    index,inside = bin_index(data,bins)
+    nbins  = len(bins)-1
+    passed = inside & np.asarray(passed,dtype=bool).ravel()
+    return accumulate(index,passed,nbins,weights=weights),accumulate(index,inside,nbins,weights=weights)
+
+
+def fill2D(xdata,ydata,xbins,ybins,weights=None):
+    """
+    Fill the bin contents and sum of weights squared in one pass over the data.
+    Contents are returned flattened with the x-bin as the slow index, i.e., 
+    reshape(nbinsx,nbinsy) recovers the layout of numpy.histogram2d.
+    """
+    nbinsx = len(xbins)-1
+    nbinsy = len(ybins)-1
+
+    xindex,xinside = bin_index(xdata,xbins)
+    yindex,yinside = bin_index(ydata,ybins)
+    index = xindex*nbinsy + yindex             # flat index of each (x,y) pair
+
+    return accumulate(index,xinside & yinside,nbinsx*nbinsy,weights=weights)
+
+
+def rebin_edges(bins,reBin,rtol=1e-6):
+    """
+    Bin edges after re-binning (as TH1::Rebin), or None if 'reBin' doesn't fit the binning:
+    - an integer merges groups of 'reBin' bins; bins above the last full group are dropped
+      (ROOT puts them in the overflow)
+    - new edges must match existing edges within 'rtol' of the smallest bin width
+      (the existing edges are returned, so values read back from files still match)
+    """
+    bins  = np.asarray(bins,dtype=np.float64)
+    nbins = len(bins)-1
+
+    if isinstance(reBin,(int,long)):
+        if reBin<=0 or reBin>nbins: return None
+        return bins[:(nbins//reBin)*reBin+1:reBin]
+
+    new_bins = np.asarray(reBin,dtype=np.float64)
+    if new_bins.ndim!=1 or new_bins.size<2: return None
+
+    index = np.clip(np.searchsorted(bins,new_bins),1,nbins)
+    index = index - ((new_bins-bins[index-1])<(bins[index]-new_bins))    # nearest edge
+    tolerance = rtol*np.min(np.diff(bins))
+    if np.any(np.abs(bins[index]-new_bins)>tolerance) or np.any(np.diff(index)<=0):
+        return None
+
+    return bins[index]
+
+
+def merge_bins(values,bins,new_bins,axis=0):
+    """Sum the values of consecutive bins into the (subset of) bin edges 'new_bins'"""
+    edge_idx = np.searchsorted(bins,new_bins)
+
+    in_range = [slice(None)]*np.ndim(values)   # drop bins above the last new edge
+    in_range[axis] = slice(0,edge_idx[-1])
+
+    return np.add.reduceat(values[tuple(in_range)],edge_idx[:-1],axis=axis)
+
 
 
 class Hist(object):
     """Internal histogram-like object for storing & manipulating data"""
-    def __init__(self):
-        """Store data for plotting in a class"""
+    def __init__(self,bins=None):
+        """
+        Store data for plotting in a class
+        @param bins    (optional) bin edges for an empty histogram to fill():
+                       array of edges (1D) or {'x':edges,'y':edges} / [xedges,yedges] (2D)
+        """
         self.content = None
         self.error   = None
+        self.sumw2   = None        # sum of weights squared (variance) in each bin
+        self.isDensity = False     # True if the contents are a density (see density())
         self.bins    = None
         self.center  = None
         self.width   = None
@@ -38,77 +182,183 @@ class Hist(object):
         self.xwidth  = None
         self.ywidth  = None
 
+        if bins is not None:
+            self.set_bins(bins)
+            nbins = self.center['x'].size if self.is2D() else self.center.size
+            self.content = np.zeros(nbins)
+            self.sumw2   = np.zeros(nbins)
+            self.error   = np.zeros(nbins)
+
+    def is2D(self):
+        return isinstance(self.bins,dict)
+
+    def set_bins(self,bins):
+        """Set the bin edges, centers and (half) widths of the histogram"""
+        try:
+            xbins = np.asarray(bins['x'],dtype=np.float64)
+            ybins = np.asarray(bins['y'],dtype=np.float64)
+        except (TypeError,IndexError,ValueError):
+            if np.ndim(bins[0])>0:
+                xbins = np.asarray(bins[0],dtype=np.float64)
+                ybins = np.asarray(bins[1],dtype=np.float64)
+            else:
+                # 1D histogram
+                self.bins   = np.asarray(bins,dtype=np.float64)
+                self.center = tools.midpoints(self.bins)
+                self.width  = tools.widths(self.bins)
+                return
+
+        xcenter,ycenter = tools.dummy_bins2D(tools.midpoints(xbins),tools.midpoints(ybins))
+        xwidth,ywidth   = tools.dummy_bins2D(tools.widths(xbins),tools.widths(ybins))
+
+        self.bins    = {'x':xbins,  'y':ybins}
+        self.center  = {'x':xcenter,'y':ycenter}
+        self.width   = {'x':xwidth, 'y':ywidth}
+        self.xbins   = xbins
+        self.ybins   = ybins
+        self.xcenter = xcenter
+        self.ycenter = ycenter
+        self.xwidth  = xwidth
+        self.ywidth  = ywidth
+
+        return
+
+    def fill(self,data,weights=None):
+        """
+        Accumulate (a chunk of) data into the histogram with fixed bin edges.
+        Can be called many times, e.g., once per chunk of a large file.
+        @param data       array of values (1D) or {'x':x,'y':y} / [x,y] (2D)
+        @param weights    (optional) array of weights with the same length as the data
+        """
+        if self.is2D():
+            try:
+                x = data['x']
+                y = data['y']
+            except (TypeError,IndexError,ValueError):
+                x = data[0]
+                y = data[1]
+            content,sumw2 = fill2D(x,y,self.bins['x'],self.bins['y'],weights=weights)
+        else:
+            content,sumw2 = fill1D(data,self.bins,weights=weights)
+
+        self.content += content
+        self.sumw2   += sumw2
+        self.error    = np.sqrt(self.sumw2)
+
+        return self
+
+    def fill_chunks(self,chunks,weights=None):
+        """
+        Fill the histogram from an iterable (e.g., generator) of data chunks.
+        @param chunks     iterable of data arrays (same format as fill())
+        @param weights    (optional) iterable of weight arrays matching 'chunks'
+        """
+        if weights is None:
+            for chunk in chunks:
+                self.fill(chunk)
+        else:
+            for chunk,weight in izip(chunks,weights):
+                self.fill(chunk,weights=weight)
+
+        return self
+
+    def variances(self):
+        """Return the sum of weights squared (derived from the errors if it was never set)"""
+        if self.sumw2 is None:
+            self.sumw2 = np.square(self.error)
+        return self.sumw2
+
     def normalize(self):
         integral = np.sum(self.content)
+        sumw2    = self.variances()
         self.content = np.divide(self.content,integral,dtype=np.float32)
-        self.error   = np.divide(self.error,  integral,dtype=np.float32)
+        self.sumw2   = np.divide(sumw2,np.square(integral),dtype=np.float32)
+        self.error   = np.sqrt(self.sumw2)
+        return
+
+    def density(self):
+        """
+        Turn the contents into a density: content / (sum of contents * bin width or area),
+        the same as 'density' in numpy/matplotlib.  The sum of weights squared is scaled too.
+        """
+        if self.is2D():
+            size = np.outer(np.diff(self.bins['x']),np.diff(self.bins['y'])).flatten()
+        else:
+            size = np.diff(self.bins)
+        integral = np.sum(self.content)
+        factor   = 1./(integral*size) if integral!=0 else np.ones_like(size)
+
+        sumw2 = self.variances()
+        self.content   = self.content*factor
+        self.sumw2     = sumw2*np.square(factor)
+        self.error     = np.sqrt(self.sumw2)
+        self.isDensity = True
+        return
+
+    def same_binning(self,other):
+        """Check if another histogram has the same bin edges"""
+        if self.is2D()!=other.is2D():
+            return False
+        if self.is2D():
+            return all(np.array_equal(self.bins[i],other.bins[i]) for i in ['x','y'])
+        return np.array_equal(self.bins,other.bins)
+
+    def Add(self,other,scale=1.):
+        """Add the contents of another histogram with the same binning (variances add)"""
+        if not self.same_binning(other):
+            print " WARNING : Cannot add histograms with different binning"
+            print "         : Not adding the histograms"
+            return
+
+        self.content = self.content + scale*other.content
+        self.sumw2   = self.variances() + np.square(scale)*other.variances()
+        self.error   = np.sqrt(self.sumw2)
+
         return
 
     def sumw2_1D(self,xdata,values=None,binning=None):
-        """Calculate the sum of weights squared using numpy.digitize"""
+        """Calculate the sum of weights squared using numpy.bincount"""
         if values is None:  values  = self.error
         if binning is None: binning = self.bins
 
-        # find the new bin location of original values
-        bin_index   = np.digitize(xdata,binning)
+        content,sumw2 = fill1D(xdata,binning,weights=values)
 
-        # find in which bin the values now exist
-        bin_weights = np.asarray([values[np.where(bin_index==idx)[0]] for idx in range(1,len(binning))])
-        bin_weights_sqr = np.square(bin_weights)
-        bin_weights_sum = [ np.sum(i) for i in bin_weights_sqr ] # in case the array has variable length elements
-
-        return np.sqrt( bin_weights_sum )
+        return np.sqrt( sumw2 )
 
 
     def sumw2_2D(self,xdata,ydata,values=None,binning=None):
-        """Calculate the sum of weights squared for 2D array using scipy.stats"""
+        """Calculate the sum of weights squared for 2D array using numpy.bincount"""
         if values is None:  values  = self.error
         if binning is None: binning = [self.bins['x'],self.bins['y']]
 
-        # find the new bin location of original values
-        s,bx,by,bin_index = scipy.stats.binned_statistic_2d(xdata,ydata,xdata,bins=binning)
-
-        # convert scipy bin_index to bin_index of given array (scipy includes over/underflow)
         nxbins = len(binning[0])-1
         nybins = len(binning[1])-1
-        xbins_unravel = nxbins+2
-        ybins_unravel = nybins+2
-        unrv_bc = np.unravel_index(bin_index,[xbins_unravel,ybins_unravel])
-        bin_idx = np.array(unrv_bc).T-1      # convert unrv_bc from tuple to 2D array
+        content,sumw2 = fill2D(xdata,ydata,binning[0],binning[1],weights=values)
 
-        # combine weights in quadrature into array
-        fvalues     = values.flatten()
-        bin_weights = np.zeros(nxbins*nybins).reshape(nxbins,nybins) # same shape as hist
-        for ix in range(nxbins):
-            for iy in range(nybins):
-                matches = [ib==[ix,iy] for ib in bin_idx.tolist()]
-                bin_weights[ix][iy] = np.sqrt( np.sum( np.square(fvalues[matches])))
-
-        return bin_weights
+        return np.sqrt( sumw2 ).reshape(nxbins,nybins)
 
 
     def Rebin(self,reBin):
-        if isinstance(reBin, (int,long)):
-            # merge bins together by some integer factor 'reBin'
-            if reBin<=0 or self.content.size%reBin:
-                print " WARNING : Cannot re-bin with {0}".format(reBin)
-                print "         : Not re-binning the histogram"
-                return
-            else:
-                reBin = np.array( [self.bins[i] for i in range(0,self.bins.size,reBin)] )
-        elif not all((i in self.bins) for i in reBin):
+        """
+        Re-bin by merging groups of 'reBin' bins (integer) or into new bin edges (a subset of the edges).
+        Bins that don't fill the last group are dropped (overflow in ROOT).
+        """
+        bin_edges = rebin_edges(self.bins,reBin)
+        if bin_edges is None:
             print " WARNING : Cannot re-bin with {0}".format(reBin)
             print "         : Not re-binning the histogram"
             return
+        if bin_edges[-1]<self.bins[-1]:
+            print " WARNING : Bins above {0} don't fill a group of {1} bins".format(bin_edges[-1],reBin)
+            print "         : Not keeping them (overflow)"
 
-        # re-bin the histogram (by making a new histogram)
-        bin_contents,bin_edges = np.histogram(self.center,bins=reBin,weights=self.content)
+        # re-bin the histogram by summing the contents & variances of the merged bins
+        sumw2 = self.variances()
 
-        self.content = bin_contents
-        self.bins    = bin_edges
-        self.center  = tools.midpoints(bin_edges)
-        self.width   = tools.widths(bin_edges)
-        self.error   = self.sumw2_1D(xdata=self.center)  # use data for re-binning, not bin content
+        self.content = merge_bins(self.content,self.bins,bin_edges)
+        self.sumw2   = merge_bins(sumw2,self.bins,bin_edges)
+        self.error   = np.sqrt(self.sumw2)
+        self.set_bins(bin_edges)
 
         return
 
@@ -120,50 +370,42 @@ class Hist(object):
         nbinsx = len(xbins)-1
         nbinsy = len(ybins)-1
 
-        xrebin = xbins.copy()         # default to original binning
-        yrebin = ybins.copy()         # default to original binning
-
         if isinstance(reBin, (int,long)):
-            # new bins should be merged bin edges
-            if reBin<=0 or nbinsx%reBin or nbinsy%reBin:
-                print " WARNING : Cannot re-bin with {0}".format(reBin)
-                print "         : Not re-binning the histogram"
-                return
-            else:
-                xrebin = np.array([xbins[i] for i in range(0,nbinsx+1,reBin)] )
-                yrebin = np.array([ybins[i] for i in range(0,nbinsy+1,reBin)] )
+            xrebin,yrebin = reBin,reBin
         else:
-            # new bins should be new array bin edges that must match previous binning:
+            # new bins should be new array bin edges that match the previous binning:
             #   can't re-bin [0,1,4,6] into [0,3,6]
             try:
                 xrebin = reBin['x']
                 yrebin = reBin['y']
-            except TypeError:
+            except (TypeError,IndexError,ValueError):
                 xrebin = reBin[0]
                 yrebin = reBin[1]
 
-            if (not all((i in xbins) for i in xrebin)) or (not all((i in ybins) for i in yrebin)):
-                print " WARNING : Cannot re-bin 2D histogram using {0}".format(reBin)
-                print "         : Not re-binning histogram"
-                return
+        # integer factors merge groups of bins along each axis (bins above the last group are dropped)
+        xrebin = rebin_edges(xbins,xrebin)
+        yrebin = rebin_edges(ybins,yrebin)
+        if xrebin is None or yrebin is None:
+            print " WARNING : Cannot re-bin 2D histogram using {0}".format(reBin)
+            print "         : Not re-binning histogram"
+            return
+        if xrebin[-1]<xbins[-1] or yrebin[-1]<ybins[-1]:
+            print " WARNING : Bins above x={0}, y={1} don't fill a group of {2} bins".format(xrebin[-1],yrebin[-1],reBin)
+            print "         : Not keeping them (overflow)"
 
-        # - generate dummy values of the bin centers and pass data as weights
-        xbins,ybins = tools.dummy_bins2D(tools.midpoints(xbins),tools.midpoints(ybins))
-        rb_hist2d   = np.histogram2d(xbins,ybins,bins=[xrebin,yrebin],weights=self.content.tolist())
-        bin_contents,xbin_edges,ybin_edges = rb_hist2d
+        # - sum the contents & variances of the merged bins along each axis
+        bin_contents = self.content.reshape(nbinsx,nbinsy)
+        bin_contents = merge_bins(bin_contents,xbins,xrebin,axis=0)
+        bin_contents = merge_bins(bin_contents,ybins,yrebin,axis=1)
 
-        self.content = bin_contents.flatten()
-        self.bins    = {'x':xbin_edges,'y':ybin_edges}
+        bin_sumw2 = self.variances().reshape(nbinsx,nbinsy)
+        bin_sumw2 = merge_bins(bin_sumw2,xbins,xrebin,axis=0)
+        bin_sumw2 = merge_bins(bin_sumw2,ybins,yrebin,axis=1)
 
-        xbin_center,ybin_center = tools.dummy_bins2D(tools.midpoints(xbin_edges),tools.midpoints(ybin_edges))
-        xbin_width,ybin_width   = tools.dummy_bins2D(tools.widths(xbin_edges),tools.widths(ybin_edges))
-        self.center  = {'x':xbin_center,'y':ybin_center}
-        self.width   = {'x':xbin_width, 'y':ybin_width}
-
-        if _scipy_available:
-            self.error = self.sumw2_2D(xdata=xbins,ydata=ybins)
-        else:
-            self.error = np.sqrt(bin_contents.flatten())
+        self.content = bin_contents.flatten()
+        self.sumw2   = bin_sumw2.flatten()
+        self.error   = np.sqrt(self.sumw2)
+        self.set_bins({'x':xrebin,'y':yrebin})
 
         return
 
@@ -1,6 +1,6 @@
 """
 Created:         6 April     2016
-Last Updated:   13 July      2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -15,19 +15,69 @@ Class to plot basic 1D histograms
 
 This does not include an interface to load/access data.
 Here we just plot the 1D data we're given.
+
+With 'template = True', the figure (axes, ticks, CMS labels, legend) of a plot is
+kept after it is saved.  The next plot with the same structure (samples, styles,
+ratios, options -- everything but the data and labels) reuses it: only the data
+artists are redrawn, the axis limits are updated, and the legend texts are replaced.
+At most 'max_templates' figures are kept; a figure is closed if its plot fails.
 """
 from math import fabs
-from copy import deepcopy
+from copy import copy
+from collections import OrderedDict
 
 from plotter import Plotter,PlotterData
 import tools
+import labels
+import ratios
+import fileCache
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-from matplotlib import gridspec
-from matplotlib.ticker import FormatStrFormatter
 import numpy as np
 
+mpl      = tools.LazyModule('matplotlib')
+plt      = tools.LazyModule('matplotlib.pyplot')
+gridspec = tools.LazyModule('matplotlib.gridspec')
+ticker   = tools.LazyModule('matplotlib.ticker')
+patches  = tools.LazyModule('matplotlib.patches')
+
+
+templates     = OrderedDict()   # structure of the plot -> figure, axes, data artists, legend
+max_templates = 8               # number of figures to keep (least recently used are closed)
+
+
+def structure_key(value):
+    """
+    Hashable key of a plot option for template_structure().
+    Arrays are keyed by a digest of all of their contents (see fileCache.option_key),
+    other objects by their repr (unique to the object if it doesn't define one).
+    """
+    if isinstance(value,dict):
+        return tuple( (k,structure_key(value[k])) for k in sorted(value) )
+    if isinstance(value,(list,tuple)):
+        return (type(value).__name__,)+tuple(structure_key(v) for v in value)
+    if isinstance(value,np.ndarray):
+        return fileCache.option_key(value)
+    if isinstance(value,type):
+        return value.__name__
+    if value is None or isinstance(value,(basestring,int,long,float,bool)):
+        return value
+    return repr(value)
+
+
+def close_template(structure):
+    """Forget a template and close its figure (e.g., after a plot failed)"""
+    template = templates.pop(structure,None)
+    if template is not None:
+        plt.close(template['figure'])
+    return
+
+
+def close_templates():
+    """Close all figures kept as templates"""
+    while templates:
+        close_template(next(iter(templates)))
+    return
+
 
 
 
@@ -39,6 +89,7 @@ class Histogram1D(Plotter):
         self.CMSlabel = 'top left'
         self.legend   = {"ncol":-1,"draw_frame":False}
         self.ratio    = PlotterRatio()
+        self.template = False     # re-use the figure for the next plot with the same structure
 
         self.normed_arg = 'normed' if not mpl.__version__.startswith('2') else 'density'
 
@@ -53,16 +104,58 @@ class Histogram1D(Plotter):
         """
         draw_ratio = False
         if len(self.ratio.ratios2plot)>0:
+            self.ratio.initialize()
+            draw_ratio = True
+
+        structure = self.template_structure() if self.template else None
+        try:
+            return self.drawFigure(structure,draw_ratio)
+        except:
+            # don't keep a half-drawn figure for the next plot
+            if structure is not None: close_template(structure)
+            raise
+
+
+
+    def drawFigure(self,structure=None,draw_ratio=False):
+        """
+        Draw the plot, re-using the figure kept for 'structure' (see template_structure()),
+        if there is one, and keeping the new figure for the next plot otherwise
+        """
+        for closed in [k for k,t in templates.items() if not plt.fignum_exists(t['figure'].number)]:
+            del templates[closed]                   # figures closed elsewhere, e.g., plt.close('all')
+
+        template = None
+        if structure is not None and structure in templates:
+            template = templates.pop(structure)
+            templates[structure] = template         # most recently used
+
+        if template is not None:
+            # remove the data from the previous plot and re-use the rest of the figure
+            fig      = template['figure']
+            self.ax1 = template['ax1']
+            self.ax2 = template['ax2']
+            plt.figure(fig.number)
+            self.remove_artists(template['artists'])
+        elif draw_ratio:
             fig = plt.figure()
             gs  = gridspec.GridSpec(2,1,height_ratios=[3,1],hspace=0.0)
             self.ax1 = fig.add_subplot(gs[0])
             self.ax2 = fig.add_subplot(gs[1],sharex=self.ax1)
             plt.setp(self.ax1.get_xticklabels(),visible=False)
-
-            draw_ratio = True
         else:
             fig,self.ax1 = plt.subplots()
 
+        if template is None and structure is not None:
+            # kept from the start, so the figure is closed if drawing fails
+            templates[structure] = {'figure':fig,'ax1':self.ax1,'ax2':self.ax2,'artists':[],'legend':None}
+            while len(templates)>max_templates:
+                _,old_template = templates.popitem(last=False)
+                plt.close(old_template['figure'])
+
+        axes    = [ax for ax in [self.ax1,self.ax2] if ax is not None]
+        current = [self.axis_artists(ax) for ax in axes]
+
         # separate data into errorbars and histograms
         bars2plot  = [self.data2plot[e] for e in self.data2plot if self.data2plot[e].isErrorbar]
         hists2plot = [self.data2plot[e] for e in self.data2plot if self.data2plot[e].isHistogram]
@@ -76,36 +169,36 @@ class Histogram1D(Plotter):
             # need to remake content using histogram (no 'density' kwarg in plt.errorbar())
             if self.normed or bar2plot.normed:
                 bar2plot.normed = True
-                normed_kwarg = {self.normed_arg:True}
 
-                h_data  = bar2plot.data
-                og_data = h_data.content.copy()
-                data,be = np.histogram(h_data.center,bins=h_data.bins,
-                                       weights=og_data,**normed_kwarg)
-                error = h_data.error * (data/og_data)  # scale error bars
-                bar2plot.data.content = data
-                bar2plot.data.error   = error
+            h_data = bar2plot.data
+            if bar2plot.normed and not h_data.isDensity:   # arrays are already a density
+                factor = tools.density_factor(h_data.content,h_data.bins)
+                bar2plot.data.content = h_data.content*factor
+                bar2plot.data.error   = h_data.error*factor    # scale error bars
 
             tmp_barplot  = self.plotErrorbar(bar2plot)
             bars2plot[n] = tmp_barplot            # update data
 
 
         ##  Histograms (should be in background: start with zorder 100)
-        bottom = None                             # 'bottom' for stacking histograms
-        for n,hist2plot in enumerate(hists2plot):
-            hist2plot.kwargs["zorder"] = 100+n
-            hist2plot.kwargs["bottom"] = bottom if self.stacked else None
-
+        #   heights (normalized, if requested) and 'bottom' for stacking are computed up front
+        heights = []
+        for hist2plot in hists2plot:
             # if global value for 'normed' is True, override object setting
             if self.normed or hist2plot.normed:
                 hist2plot.normed = True
-                hist2plot.kwargs[self.normed_arg] = True
+            heights.append( self.histogram_heights(hist2plot.data,normed=hist2plot.normed) )
 
-            tmp_hist2plot = self.plotHistogram(hist2plot,uncertainty=hist2plot.uncertainty)
-            hists2plot[n] = tmp_hist2plot         # update data
+        bottoms = [None for _ in hists2plot]
+        if self.stacked and hists2plot:
+            bottoms = np.cumsum([np.zeros_like(heights[0])]+heights[:-1],axis=0)
 
-            if n==0: bottom  = tmp_hist2plot.plotData.copy() # modify 'bottom' for stacked plots
-            else:    bottom += tmp_hist2plot.plotData.copy()
+        for n,hist2plot in enumerate(hists2plot):
+            hist2plot.kwargs["zorder"] = 100+n
+
+            tmp_hist2plot = self.plotHistogram(hist2plot,uncertainty=hist2plot.uncertainty,
+                                               heights=heights[n],bottom=bottoms[n])
+            hists2plot[n] = tmp_hist2plot         # update data
 
         ## now that the plots have been made, update the data2plot dictionary
         for i in hists2plot: self.data2plot[i.name] = i
@@ -117,10 +210,18 @@ class Histogram1D(Plotter):
             self.plotRatio()              # make the ratio plot
             xaxis = self.ax2              # draw ratio plot xaxis instead of self.ax1
 
+        # artists that show the data (replaced when the figure is re-used)
+        artists = [self.axis_artists(ax,exclude=c) for ax,c in zip(axes,current)]
+
         ## Axis ticks/labels
         self.set_xaxis(xaxis)
         self.set_yaxis()
 
+        if template is not None:
+            template['artists'] = artists
+            self.updateLegend(template)
+            return fig
+
         ## CMS label
         if self.CMSlabel is not None:
             self.text_labels()
@@ -128,9 +229,106 @@ class Histogram1D(Plotter):
         ## Legend
         self.drawLegend()
 
+        if structure is not None:
+            templates[structure]['artists'] = artists
+            templates[structure]['legend']  = self.ax1.get_legend()
+
         return fig
 
 
+
+    def template_structure(self):
+        """
+        Describe everything in the plot except the data and labels.
+        Plots with the same description can re-use the same figure.
+        """
+        skip_plotter = ['data2plot','ax1','ax2','kwargs','data_io','saveAs','x_label','y_label',
+                        'ratio','extra_text','legend']
+        skip_sample  = ['data','plotData','label','bottom','zorder']
+
+        plotter = dict( (k,v) for k,v in self.__dict__.items() if k not in skip_plotter )
+        legend  = dict( (k,v) for k,v in self.legend.items() if not k.startswith('extra_') )
+        texts   = [t.__dict__ for t in self.extra_text.texts]
+        ratio   = dict( (k,v) for k,v in self.ratio.__dict__.items() if k!='ylabel' )
+
+        samples = []
+        for name,sample in self.data2plot.items():
+            attributes = dict( (k,v) for k,v in sample.__dict__.items() if k not in skip_sample )
+            attributes['kwargs'] = dict( (k,v) for k,v in sample.kwargs.items() if k not in skip_sample )
+            samples.append( (name,attributes) )
+
+        return ( ('class',self.__class__.__name__),
+                 ('plotter',structure_key(plotter)),
+                 ('legend',structure_key(legend)),
+                 ('texts',structure_key(texts)),
+                 ('ratio',structure_key(ratio)),
+                 ('samples',structure_key(samples)) )
+
+
+
+    def axis_artists(self,axis,exclude=None):
+        """
+        Return the artists (and containers, e.g., from errorbar) drawn on an axis,
+        excluding those in 'exclude' (a previous result of this function)
+        """
+        children   = axis.get_children()
+        containers = list(axis.containers)
+        if exclude is not None:
+            _,old_children,old_containers = exclude
+            old_children   = set(id(c) for c in old_children)
+            old_containers = set(id(c) for c in old_containers)
+            children   = [c for c in children if id(c) not in old_children]
+            containers = [c for c in containers if id(c) not in old_containers]
+
+        return axis,children,containers
+
+
+
+    def remove_artists(self,artists):
+        """
+        Remove artists (and containers) returned by axis_artists().
+        The data limits are reset so the axes are scaled to the next data drawn.
+        """
+        for axis,children,containers in artists:
+            for container in containers:
+                container.remove()
+                if container in axis.containers: axis.containers.remove(container)
+            for child in children:
+                try:
+                    child.remove()
+                except (ValueError,NotImplementedError):
+                    continue   # already removed with its container
+
+            axis.ignore_existing_data_limits = True
+            axis.set_autoscale_on(True)
+            axis.set_prop_cycle(None)    # same default colors as a new axis
+
+        return
+
+
+
+    def updateLegend(self,template):
+        """Replace the texts of the legend in a re-used figure"""
+        handles,labels = self.ax1.get_legend_handles_labels()
+        if 'extra_handles' in self.legend.keys():
+            labels += self.legend.pop('extra_labels')
+            self.legend.pop('extra_handles')
+
+        legend = template['legend']
+        texts  = legend.get_texts() if legend is not None else []
+        if len(texts)!=len(labels):
+            if legend is not None: legend.remove()
+            self.drawLegend()
+            template['legend'] = self.ax1.get_legend()
+            return
+
+        for text,label in zip(texts,labels):
+            text.set_text(label)
+
+        return
+
+
+
     def plotErrorbar(self,bar2plot,axis=None,**kwargs):
         """Draw errorbar plot(s)"""
         if axis is None: axis = self.ax1
@@ -156,18 +354,58 @@ class Histogram1D(Plotter):
 
 
 
-    def plotHistogram(self,histogram,axis=None,uncertainty={},**kwargs):
-        """Plot histograms"""
+    def histogram_heights(self,h_data,normed=False):
+        """Heights of the histogram bars (density if normed, unless the data is already a density)"""
+        heights = np.asarray(h_data.content,dtype=np.float64)
+        if normed and not h_data.isDensity: heights = heights*tools.density_factor(heights,h_data.bins)
+        return heights
+
+
+    def step_vertices(self,bins,heights,bottom,fill=False):
+        """
+        Vertices of a step histogram: the outline from 'bottom' at the first edge to 
+        'bottom' at the last edge (fill=False), or the closed region between 'bottom' and 
+        the bar heights (fill=True).  'bottom' and 'heights' are arrays with one value per bin.
+        """
+        edges = np.repeat(bins,2)[1:-1]             # x0,x1,x1,x2,x2,...,xN
+        tops  = np.repeat(bottom+heights,2)
+
+        if fill:
+            x = np.concatenate([edges,edges[::-1]])
+            y = np.concatenate([tops,np.repeat(bottom,2)[::-1]])
+        else:
+            x = np.concatenate([[bins[0]],edges,[bins[-1]]])
+            y = np.concatenate([[bottom[0]],tops,[bottom[-1]]])
+
+        return np.column_stack([x,y])
+
+
+    def plotHistogram(self,histogram,axis=None,uncertainty={},heights=None,**kwargs):
+        """
+        Plot histograms.
+        The steps are drawn directly from the bin contents and edges (one polygon per histogram).
+
+        @param heights    heights of the bars (default: bin contents; density if 'density'/'normed' kwarg)
+        @param kwargs     'bottom' (for stacking) and matplotlib Patch arguments
+        """
         if axis is None: axis = self.ax1
         histogram.kwargs.update(kwargs)
 
         h_data  = histogram.data
-        data    = h_data.content
-        error   = h_data.error
-        binning = h_data.bins
-        bin_center = h_data.center
+        binning = np.asarray(h_data.bins,dtype=np.float64)
         this_label = histogram.label
 
+        # separate arguments for the histogram from arguments for the polygon
+        patch_kwargs = dict(histogram.kwargs)
+        bottom = patch_kwargs.pop("bottom",None)
+        normed = any([patch_kwargs.pop(k,False) for k in ['density','normed']])
+        for k in ['bins','weights','range','histtype','cumulative','align','orientation','rwidth','log','stacked']:
+            patch_kwargs.pop(k,None)
+
+        if heights is None:
+            heights = self.histogram_heights(h_data,normed=normed)
+        bottom = np.zeros_like(heights) if bottom is None else np.broadcast_to(bottom,heights.shape)
+
         if histogram.draw_type=='step':
             # Changing legend for step histograms -> a line instead of a rectangle
             this_label = None
@@ -176,14 +414,17 @@ class Histogram1D(Plotter):
                           ls=histogram.linestyle,label=histogram.label)
 
         # Make the histogram
-        data,b,p = axis.hist(bin_center,bins=binning,weights=data,
-                             label=this_label,
-                             lw=histogram.linewidth,histtype=histogram.draw_type,
-                             ls=histogram.linestyle,
-                             color=histogram.color,
-                             edgecolor=histogram.edgecolor,
-                             **histogram.kwargs)
-        histogram.plotData = data
+        fill  = (histogram.draw_type=='stepfilled')
+        patch = patches.Polygon(self.step_vertices(binning,heights,bottom,fill=fill),
+                        closed=fill,fill=fill,label=this_label,
+                        lw=histogram.linewidth,ls=histogram.linestyle,
+                        facecolor=histogram.color,edgecolor=histogram.edgecolor,
+                        **patch_kwargs)
+        axis.add_patch(patch)
+        patch.sticky_edges.y.append(np.min(bottom) if bottom.size else 0)
+        axis.autoscale_view()
+
+        histogram.plotData = heights
 
         # only use this for histograms because errorbar has 'yerr' option
         # uncertainty might be a bool and just use the options from hist to plot it
@@ -210,62 +451,63 @@ class Histogram1D(Plotter):
         self.ratio.initialize()       # set parameters for ratio plots
         value = self.ratio.value      # type of plot (ratio/significance)
 
-        min_ratio = 0
-        for d in self.ratio.ratios2plot:
-            numerator   = self.data2plot[d['numerator']]
-            denominator = self.data2plot[d['denominator']]
-
-            num_data = numerator.plotData
-            den_data = denominator.plotData
+        # all ratios in one pass: (ratios x bins) arrays
+        ratios2plot  = self.ratio.ratios2plot
+        numerators   = [self.data2plot[d['numerator']]   for d in ratios2plot]
+        denominators = [self.data2plot[d['denominator']] for d in ratios2plot]
 
-            # create new object for plotting ratio (clone numerator properties)
-            ratio_data = deepcopy(numerator)
+        min_ratio = 0
+        if ratios2plot:
+            # (down,up) uncertainties (asymmetric for efficiencies)
+            def errors(h):
+                error = h.data.error if h.data.error is not None else np.zeros_like(h.plotData)
+                error = np.asarray(error,dtype=np.float64)
+                return error if error.ndim==2 else (error,error)
+            num_err = np.array([errors(n) for n in numerators])
+            den_err = np.array([errors(d) for d in denominators])
+            options = [d.get('errors',self.ratio.errors) for d in ratios2plot]
+
+            content,error,mask = ratios.divide([n.plotData for n in numerators],[d.plotData for d in denominators],
+                                               num_err[:,0],den_err[:,0],errors=options,value=value)
+            if not np.array_equal(num_err[:,0],num_err[:,1]) or not np.array_equal(den_err[:,0],den_err[:,1]):
+                _,error_up,_ = ratios.divide([n.plotData for n in numerators],[d.plotData for d in denominators],
+                                             num_err[:,1],den_err[:,1],errors=options,value=value)
+                error = np.stack([error,error_up],axis=1)       # (ratios x (down,up) x bins)
+            heights   = np.where(mask,0.,content)      # undefined bins are empty in histograms
+            min_ratio = min(min_ratio,np.min(heights))
+
+            if value=='significance' and np.any(mask & (np.asarray([n.plotData for n in numerators])!=0)):
+                print " WARNING : The significance is undefined in bins without background"
+                print "         : These bins are left empty."
+
+        for i,d in enumerate(ratios2plot):
+            numerator = numerators[i]
+
+            # new object for plotting the ratio: shares the numerator properties and binning,
+            # the content & error are views of the ratio arrays
+            ratio_data = copy(numerator)
+            ratio_data.data = copy(numerator.data)
+            ratio_data.data.content = content[i]
+            ratio_data.data.error   = error[i] if value=="ratio" else None
+            ratio_data.data.sumw2   = None
 
             # using the kwargs option in Ratio.Add(), the user can modify properties
             ratio_kwargs = d['kwargs']
             self.setParameters(ratio_data,**ratio_kwargs)
             uncertainty  = d.get("uncertainty",{})
 
-
-            # calculate the ratio
-            if value=="ratio":
-                ratio_data.data.content = (num_data / den_data).copy()
-                ratio_data.data.error   = (numerator.data.error / den_data).copy()
-            else:
-                # significance = s/sqrt(b) for now
-                ratio_data.data.content = (num_data / np.sqrt(den_data)).copy()
-                ratio_data.data.error   = None
-
-            min_ratio_data = min(ratio_data.data.content)
-            if min_ratio_data<min_ratio: min_ratio=min_ratio_data
-
             # make the ratio plot
-            inf_ind = np.where( np.isinf(ratio_data.data.content) )  # remove infinities 
-
             if ratio_data.draw_type=='errorbar':
-                ratio_data.data.content[inf_ind] = np.nan
                 ratio_data.kwargs["xerr"] = ratio_kwargs.get('xerr',numerator.data.width)
                 ratio_data.kwargs["zorder"] = ratio_data.kwargs.get("zorder",150)
 
                 self.plotErrorbar(ratio_data,axis=self.ax2)
             else:
-                # remove NaN/inf values from hist
-                content = ratio_data.data.content
-                max_con = max( [i for i in content if not (np.isnan(i) or np.isinf(i))] )
-                nan_ind = np.where( np.isnan(content) )
-                ratio_data.data.content[nan_ind] = 0.
-                ratio_data.data.content[inf_ind] = 10.*max_con
-
-                if len(inf_ind)>0 and value=='significance':
-                    print " WARNING : The significance calculation yielded infinite values"
-                    print "         : These will skew the histogram visualization - "
-                    print "         : consider changing to an 'errorbar' plot. "
-
                 # set some options unless user specifies them in 'kwargs'
                 ratio_data.kwargs["zorder"]  = ratio_data.kwargs.get("zorder",100)
                 ratio_data.kwargs[self.normed_arg] = ratio_kwargs.get(self.normed_arg,False)
 
-                self.plotHistogram(ratio_data,axis=self.ax2,uncertainty=uncertainty)
+                self.plotHistogram(ratio_data,axis=self.ax2,uncertainty=uncertainty,heights=heights[i])
 
         ## Add extra line for ratio plot
         if value=='ratio':
@@ -283,7 +525,7 @@ class Histogram1D(Plotter):
         self.ax2.set_ylabel(self.ratio.ylabel,ha='center',va='bottom')
 
         # Modify tick labels
-        formatter = FormatStrFormatter('%g')
+        formatter = ticker.FormatStrFormatter('%g')
         self.ax2.set_yticklabels(np.array([formatter(i) for i in axis_ticks]))
 
         if self.ratio.update_legend:
@@ -300,7 +542,7 @@ class Histogram1D(Plotter):
         Plot uncertainties for 'step' and 'stepfilled' data 
         (errorbar already has this functionality).
 
-        @param hist     PlotterData() object to plot
+        @param hist     PlotterData() object to plot (hist.data.error: symmetric or (down,up) uncertainties)
         @param axis     Axis for drawing the plot
         @param kwargs   Any extra plotting arguments passed here -- these will override
                         parameters in hist and hist.kwargs
@@ -308,11 +550,12 @@ class Histogram1D(Plotter):
         """
         hist.kwargs.update(kwargs)
 
-        error   = hist.data.error.copy()
+        error   = np.asarray(hist.data.error,dtype=np.float64)   # symmetric, or (down,up)
         nominal = hist.plotData.copy()
         binning = hist.data.bins.copy()
 
-        resid_unc = {'up':nominal+error, 'dn':nominal-error}
+        error_dn,error_up = error if error.ndim==2 else (error,error)
+        resid_unc = {'up':nominal+error_up, 'dn':nominal-error_dn}
         if kwargs.get('normalize'):
             resid_unc['up'] /= nominal
             resid_unc['dn'] /= nominal
@@ -370,6 +613,7 @@ class PlotterRatio(object):
         self.ylim   = None
         self.yticks = None
         self.ylabel = ''
+        self.errors = 'numerator'    # uncertainty propagation: 'numerator','both','binomial' (see ratios.py)
         self.update_legend = False   # add ratio values to legend on main plot
 
     def initialize(self):
@@ -381,7 +625,7 @@ class PlotterRatio(object):
             self.value = 'ratio'
 
         if not self.ylabel:
-            self.ylabel = 'Ratio' if self.value=='ratio' else r'S/$\sqrt{\text{B}}$'
+            self.ylabel = 'Ratio' if self.value=='ratio' else r'S/$\sqrt{%s}$'%labels.text('B')
 
         if self.value=='ratio':
             if self.ylim is None:   self.ylim   = (0.5,1.5)
@@ -396,6 +640,7 @@ class PlotterRatio(object):
         @param denominator      name to identify data for denominator
         @param kwargs           arguments for matplotlib options
                                 *including drawing an uncertainty band*
+                                and 'errors' to override the uncertainty propagation of this ratio
                    -- hist:     https://matplotlib.org/api/_as_gen/matplotlib.pyplot.hist.html
                    -- errorbar: https://matplotlib.org/api/_as_gen/matplotlib.pyplot.errorbar.html
         """
@@ -404,6 +649,8 @@ class PlotterRatio(object):
         if kwargs.get("uncertainty"):
             params['uncertainty'] = kwargs['uncertainty']
             kwargs.pop('uncertainty')
+        if 'errors' in kwargs:
+            params['errors'] = kwargs.pop('errors')
         params['kwargs'] = kwargs
 
         if ratio in self.listOfRatios:
@@ -1,6 +1,6 @@
 """
 Created:         6 April     2016
-Last Updated:   11 July      2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -18,12 +18,43 @@ Here we just plot the 2D data we're given.
 """
 from plotter import Plotter,PlotterData
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-from matplotlib.colors import LogNorm
 import numpy as np
 
 import tools
+import labels
+from hist import binning_scheme
+
+mpl = tools.LazyModule('matplotlib')
+plt = tools.LazyModule('matplotlib.pyplot')
+
+
+
+def text_sizes(text,fontsize):
+    """
+    Approximate (width,height) in points of text drawn with the default font, from the
+    metrics of each character (advances, and the ink of the first & last characters).
+    Cheap compared to building the text outlines; kerning is ignored.
+    """
+    from matplotlib.font_manager import FontProperties,findfont,get_font
+    from matplotlib.ft2font import LOAD_NO_HINTING
+
+    font = get_font(findfont(FontProperties()))
+    font.set_size(fontsize,72)      # 1 pixel = 1 point
+
+    metrics = {}                    # character -> (advance,x0,x1,y0,y1)
+    for char in set(u''.join(text)):
+        glyph = font.load_char(ord(char),flags=LOAD_NO_HINTING)
+        x0,y1 = glyph.horiBearingX/64.,glyph.horiBearingY/64.
+        metrics[char] = (glyph.linearHoriAdvance/65536.,x0,x0+glyph.width/64.,y1-glyph.height/64.,y1)
+
+    sizes = np.zeros((len(text),2))
+    for i,label in enumerate(text):
+        chars = [metrics[c] for c in label]
+        ink   = [c for c in chars if c[2]>c[1]] or [(0,0,0,0,0)]
+        sizes[i,0] = sum(c[0] for c in chars[:-1]) + chars[-1][2] - chars[0][1]
+        sizes[i,1] = max(c[4] for c in ink) - min(c[3] for c in ink)
+
+    return sizes
 
 
 
@@ -40,7 +71,10 @@ class Histogram2D(Plotter):
         self.write_bin_errors = False
         self.write_bin_yields = False
 
-        self.bin_text = {"color":"k","ha":"center","va":"center"}
+        # options for the bin values: format (printf-style), skip bins with |value|<threshold,
+        # and skip bins smaller than the label at the final figure size ('min_size')
+        self.bin_text = {"color":"k","ha":"center","va":"center","format":"%.1f",
+                         "fontsize":None,"threshold":None,"min_size":True}
 
         return
 
@@ -48,7 +82,8 @@ class Histogram2D(Plotter):
 
     def execute(self):
         """
-        Make the plot using `pyplot.hist2d()`.
+        Make the plot by drawing the binned content directly
+        (an image for uniform binning, a quad mesh otherwise).
         return the Figure object to the user (they can edit it if they please)
         """
         fig,self.ax1 = plt.subplots()
@@ -58,32 +93,28 @@ class Histogram2D(Plotter):
 
         h_data = data2plot.data
         data   = h_data.content
-        error  = h_data.error
-        bins_x = h_data.bins['x']
-        bins_y = h_data.bins['y']
-        x_bin_center = h_data.center['x']
-        y_bin_center = h_data.center['y']
+        bins_x = np.asarray(h_data.bins['x'],dtype=np.float64)
+        bins_y = np.asarray(h_data.bins['y'],dtype=np.float64)
 
         # Make the plot
         self.setColormap(data)
         data2plot.kwargs['cmap']   = self.colormap
-        data2plot.kwargs['norm']   = LogNorm() if self.logplot['data'] else None
-        data2plot.kwargs['normed'] = self.normed or data2plot.normed
-
-        h_,x_,y_,i_ = plt.hist2d(x_bin_center,y_bin_center,bins=[bins_x,bins_y],\
-                      weights=data.flatten(),**data2plot.kwargs)
+        data2plot.kwargs['norm']   = mpl.colors.LogNorm() if self.logplot['data'] else None
+        data2plot.kwargs['normed'] = (self.normed or data2plot.normed) and not h_data.isDensity
 
-        # Plot bin values/errors, if requested
-        if self.write_bin_yields: self.writeYields(data, x_bin_center,y_bin_center)
-        if self.write_bin_errors: self.writeErrors(error,x_bin_center,y_bin_center)
+        mesh = self.plotMesh(data,bins_x,bins_y,**data2plot.kwargs)
 
         # Configure the colorbar
-        self.drawColorbar()
+        self.drawColorbar(mesh)
 
         ## Axis ticks/labels
         self.set_xaxis()
         self.set_yaxis()
 
+        # Plot bin values/errors, if requested (after the axes are set to know the size of each bin)
+        if self.write_bin_errors:   self.writeErrors(h_data)
+        elif self.write_bin_yields: self.writeYields(h_data)
+
         ## CMS label
         if self.CMSlabel is not None:
             self.text_labels()
@@ -92,15 +123,57 @@ class Histogram2D(Plotter):
 
 
 
-    def drawColorbar(self):
+    def plotMesh(self,content,bins_x,bins_y,normed=False,cmin=None,cmax=None,**kwargs):
+        """
+        Draw the bin contents (flattened x-major, shape (nx*ny,)) as one artist.
+        Uniform binning on linear axes is drawn with `imshow()`, other binnings with `pcolormesh()`.
+
+        @param normed      draw the density (content / (sum of contents * bin area))
+        @param cmin,cmax   bins with content below/above these values are not drawn (as in `hist2d()`)
+        @param kwargs      matplotlib arguments for the artist, e.g., 'cmap' and 'norm'
+        Returns the artist (used for the colorbar)
+        """
+        nx,ny  = bins_x.size-1,bins_y.size-1
+        values = np.asarray(content,dtype=np.float64).reshape(nx,ny).T   # rows of y, columns of x
+
+        if normed:
+            area  = np.outer(np.diff(bins_y),np.diff(bins_x))
+            total = values.sum()
+            if total!=0: values = values / (total*area)
+
+        if cmin is not None or cmax is not None:
+            mask = np.zeros(values.shape,dtype=bool)
+            if cmin is not None: mask |= (values<cmin)
+            if cmax is not None: mask |= (values>cmax)
+            values = np.ma.masked_array(values,mask=mask)
+
+        # hist2d() arguments that don't apply to the artist
+        for k in ['bins','range','weights','density']:
+            kwargs.pop(k,None)
+
+        uniform = [binning_scheme(b) for b in [bins_x,bins_y]]
+        if all(u is not None and not u[2] for u in uniform) and \
+           not self.logplot['x'] and not self.logplot['y']:
+            kwargs.setdefault('interpolation','nearest')
+            mesh = self.ax1.imshow(values,origin='lower',aspect='auto',
+                                   extent=[bins_x[0],bins_x[-1],bins_y[0],bins_y[-1]],**kwargs)
+        else:
+            mesh = self.ax1.pcolormesh(bins_x,bins_y,values,**kwargs)
+
+        return mesh
+
+
+
+    def drawColorbar(self,mappable=None):
         """
         Draw the vertically-oriented colorbar.
+        @param mappable    artist the colorbar describes (default: current image)
 
         * Not many customizable options here because the colorbar is a 'plt' object
         * and the options are applied to attributes.  
         * User needs to modify or extend this function.
         """
-        cbar = plt.colorbar()
+        cbar = plt.colorbar(mappable,ax=self.ax1)
 
         try:
             cbar.ax.set_ylabel(self.colorbar["title"])
@@ -115,7 +188,7 @@ class Histogram2D(Plotter):
             for i,atl in enumerate(axis_ticklabels):
                 if not "10^{" in atl: continue
                 atl = atl.strip("$")
-                power = r"10$^{\text{%s}}$"%tools.extract(atl)
+                power = "10"+labels.superscript(atl.split("10^{")[1].split("}")[0])
                 tmp   = atl.split("\\times")
                 if len(tmp)>1:
                     axis_ticklabels[i] = tmp[0]+r"$\times$"+power
@@ -137,27 +210,96 @@ class Histogram2D(Plotter):
 
 
 
-    def writeYields(self,h_data=[],x_bin_center=[],y_bin_center=[],bin_data=None):
-        """Print bin values inside the plots for each bin."""
-        if bin_data is None: bin_data = self.bin_text
+    def writeYields(self,h_data,errors=False,bin_data=None):
+        """
+        Print bin values ("value" or "value $\pm$ error") inside the plot for each bin.
 
-        if isinstance(bin_data["color"],basestring):
-            color = bin_data["color"]
-            bin_data["color"] = [color for _ in x_bin_center]
+        Labels are formatted for all bins at once and drawn as a single collection of
+        text outlines (one artist, no LaTeX rendering per bin).
+        Empty bins, bins with |value| below bin_data['threshold'], and bins smaller than
+        their label at the figure size (if bin_data['min_size']) are skipped.
 
-        for i,e in enumerate(h_data):
-            self.ax1.text(x_bin_center[i],y_bin_center[i],
-                          "{0:.1f}".format(e),
-                          ha=bin_data["ha"],va=bin_data["va"],
-                          color=bin_data["color"][i])
+        @param h_data      Hist object that is plotted
+        @param errors      include the bin errors in the labels
+        @param bin_data    options for the text (default: self.bin_text)
+        """
+        if bin_data is None: bin_data = self.bin_text
+        fmt = bin_data.get("format","%.1f")
+
+        values = np.asarray(h_data.content,dtype=np.float64).ravel()
+        keep   = np.isfinite(values) & (values!=0)
+        if bin_data.get("threshold") is not None:
+            keep &= (np.abs(values)>=bin_data["threshold"])
+
+        text = np.char.mod(fmt,values[keep])
+        if errors:
+            uncertainty = np.asarray(h_data.error,dtype=np.float64).ravel()[keep]
+            text = np.char.add(np.char.add(text.astype(np.unicode_),u" \u00b1 "),np.char.mod(fmt,uncertainty))
+
+        if not text.size: return
+
+        from matplotlib.collections import PathCollection
+        from matplotlib.path import Path
+        from matplotlib.textpath import TextPath
+        from matplotlib.transforms import Affine2D
+
+        fontsize = bin_data.get("fontsize") or mpl.rcParams['font.size']
+        unique,inverse = np.unique(text,return_inverse=True)
+
+        x_center = np.asarray(h_data.center['x'],dtype=np.float64)[keep]
+        y_center = np.asarray(h_data.center['y'],dtype=np.float64)[keep]
+        colors   = bin_data["color"]
+        if not isinstance(colors,basestring):
+            colors = np.asarray(colors)[keep]
+
+        bin_size = None
+        if bin_data.get("min_size",True):
+            # size of each bin in points at the final figure size:
+            # skip labels that can't fit (from the font metrics) before building their outlines
+            x_width = np.asarray(h_data.width['x'],dtype=np.float64)[keep]
+            y_width = np.asarray(h_data.width['y'],dtype=np.float64)[keep]
+            lower   = self.ax1.transData.transform( np.column_stack([x_center-x_width,y_center-y_width]) )
+            upper   = self.ax1.transData.transform( np.column_stack([x_center+x_width,y_center+y_width]) )
+            bin_size = np.abs(upper-lower) * 72. / self.ax1.figure.dpi
+            visible  = np.all(bin_size>=0.95*text_sizes(unique,fontsize)[inverse],axis=1)
+
+            x_center,y_center,inverse,bin_size = x_center[visible],y_center[visible],inverse[visible],bin_size[visible]
+            if not isinstance(colors,basestring): colors = colors[visible]
+            if not inverse.size: return
+
+        # Text outlines (in points) for each unique label that is drawn, aligned to the bin center
+        drawn,inverse = np.unique(inverse,return_inverse=True)
+        paths = []
+        sizes = np.zeros((drawn.size,2))
+        for i,label in enumerate(unique[drawn]):
+            path  = TextPath((0,0),label,size=fontsize,usetex=False)
+            (x0,y0),(x1,y1) = path.get_extents().get_points()
+            dx = {'left':-x0,'right':-x1}.get(bin_data.get("ha","center"),-0.5*(x0+x1))
+            dy = {'bottom':-y0,'top':-y1}.get(bin_data.get("va","center"),-0.5*(y0+y1))
+            paths.append( Path(path.vertices+[dx,dy],path.codes) )
+            sizes[i] = [x1-x0,y1-y0]
+
+        if bin_size is not None:
+            visible = np.all(bin_size>=sizes[inverse],axis=1)
+            x_center,y_center,inverse = x_center[visible],y_center[visible],inverse[visible]
+            if not isinstance(colors,basestring): colors = colors[visible]
+            if not inverse.size: return
+
+        yields = PathCollection([paths[i] for i in inverse],
+                                offsets=np.column_stack([x_center,y_center]),
+                                transOffset=self.ax1.transData,
+                                facecolors=colors,edgecolors='none',zorder=10)
+        yields.set_transform( Affine2D().scale(1./72.)+self.ax1.figure.dpi_scale_trans )  # points -> pixels
+        yields.set_gid('text')     # text stays vector (see figureWriter.rasterize)
+        self.ax1.add_collection(yields,autolim=False)
 
         return
 
 
 
-    def writeErrors(self,h_data=[],x_bin_center=[],y_bin_center=[]):
-        """Print bin errors inside the plots for each bin."""
-        self.writeYields(h_data,x_bin_center,y_bin_center)
+    def writeErrors(self,h_data,bin_data=None):
+        """Print bin values and errors ("value $\pm$ error") inside the plots for each bin."""
+        self.writeYields(h_data,errors=True,bin_data=bin_data)
         return
 
 
@@ -0,0 +1,81 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Measure the time to import each hepPlotter module (each in a new python process)
+and check it against a budget.  Importing hepPlotter should not load any heavy
+module (matplotlib, ROOT, uproot, scipy): these are imported on first use,
+e.g., in Plotter.initialize() or when a file is opened.
+
+  python -m importBudget [--budget 0.25]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+
+modules = ['tools','hist','labels','fileCache','intervals','baseIO','rootIO','uprootIO','numpyIO','ioBackends','figureWriter','ratios','systematics',
+           'parallelIO','plotter','histogram1D','histogram2D','datamc','efficiency1D','batchPlotter']
+heavy   = ['matplotlib','ROOT','uproot','scipy']
+budget  = 0.25     # seconds to import one module (including numpy)
+
+_measure = """
+import sys,time,json
+start = time.time()
+import numpy
+numpy_time = time.time()-start
+import {0}
+print(json.dumps({{'time':time.time()-start,'numpy':numpy_time,
+                  'heavy':[m for m in {1} if m in sys.modules]}}))
+"""
+
+
+
+def measure(module):
+    """Time to import 'module' in a new process, and the heavy modules it loaded"""
+    thisdir = os.path.dirname(os.path.realpath(__file__))
+    output  = subprocess.check_output([sys.executable,'-c',_measure.format(module,heavy)],cwd=thisdir)
+    return json.loads(output.strip().split('\n')[-1])
+
+
+def check(budget=budget,modules=modules):
+    """Print the import time of each module; return the modules over budget or loading heavy modules"""
+    failures = []
+    for module in modules:
+        result = measure(module)
+        status = 'ok'
+        if result['time']>budget or result['heavy']:
+            status = 'FAIL'
+            failures.append(module)
+
+        print " {0:<14} {1:6.3f} s (numpy {2:.3f} s) {3:4} {4}".format(module,result['time'],
+                             result['numpy'],status,' '.join(result['heavy']))
+
+    return failures
+
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Check the time to import hepPlotter modules.")
+    parser.add_argument('--budget',type=float,default=budget,help="seconds allowed per module")
+    args = parser.parse_args(args)
+
+    failures = check(budget=args.budget)
+    if failures:
+        print " ERROR : Over budget ({0} s) or loading heavy modules: {1}".format(args.budget,', '.join(failures))
+
+    return 1 if failures else 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+
+## THE END ##
@@ -0,0 +1,165 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Efficiencies and their (asymmetric) confidence intervals for all bins at once.
+Follows the conventions of ROOT TEfficiency:
+  https://root.cern.ch/doc/master/classTEfficiency.html
+"""
+from math import erf,sqrt
+import numpy as np
+
+
+def _scipy_available():
+    """Check for scipy (for intervals based on the beta distribution); imported on first use"""
+    try:
+        import scipy.special
+        return True
+    except ImportError:
+        return False
+
+
+def betaincinv(a,b,y):
+    """Inverse of the regularized incomplete beta function (scipy.special.betaincinv)"""
+    from scipy.special import betaincinv
+    return betaincinv(a,b,y)
+
+
+# TEfficiency::EStatOption (TEfficiency::GetStatisticOption()) -> method in this module
+root_statistic_options = {0:'clopper_pearson', 1:'normal',  2:'wilson',
+                          3:'agresti_coull',   4:'feldman_cousins',
+                          5:'jeffreys',        6:'uniform', 7:'bayesian', 8:'mid_p'}
+
+default_level = 0.682689492137   # 1 sigma (TEfficiency default)
+
+
+
+def normal_quantile(level):
+    """Return z such that [-z,z] contains 'level' of a unit Gaussian (bisection on math.erf)"""
+    lo,hi = 0.,40.
+    for _ in range(100):
+        z = 0.5*(lo+hi)
+        if erf(z/sqrt(2.))<level: lo = z
+        else: hi = z
+    return 0.5*(lo+hi)
+
+
+def clopper_pearson(passed,total,level=default_level):
+    """Clopper-Pearson (exact frequentist) interval; returns (lower,upper)"""
+    alpha = 0.5*(1.-level)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        lower = np.where(passed>0,    betaincinv(passed,total-passed+1,alpha),0.)
+        upper = np.where(passed<total,betaincinv(passed+1,total-passed,1.-alpha),1.)
+    return lower,upper
+
+
+def bayesian(passed,total,level=default_level,alpha=1.,beta=1.):
+    """Central interval of the Beta(passed+alpha,total-passed+beta) posterior; returns (lower,upper)"""
+    a = passed+alpha
+    b = total-passed+beta
+    tail = 0.5*(1.-level)
+    return betaincinv(a,b,tail),betaincinv(a,b,1.-tail)
+
+
+def wilson(passed,total,level=default_level):
+    """Wilson score interval; returns (lower,upper)"""
+    z  = normal_quantile(level)
+    z2 = z*z
+    with np.errstate(invalid='ignore',divide='ignore'):
+        mode  = (passed+0.5*z2)/(total+z2)
+        delta = z/(total+z2)*np.sqrt(passed*(total-passed)/total + 0.25*z2)
+    empty = (total<=0)
+    return np.where(empty,0.,mode-delta),np.where(empty,1.,mode+delta)
+
+
+def agresti_coull(passed,total,level=default_level):
+    """Agresti-Coull interval; returns (lower,upper)"""
+    z  = normal_quantile(level)
+    z2 = z*z
+    mode  = (passed+0.5*z2)/(total+z2)
+    delta = z*np.sqrt(mode*(1.-mode)/(total+z2))
+    return np.clip(mode-delta,0.,1.),np.clip(mode+delta,0.,1.)
+
+
+def normal(passed,total,level=default_level):
+    """Normal approximation (symmetric, truncated to [0,1]); returns (lower,upper)"""
+    z = normal_quantile(level)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        eff   = np.where(total>0,passed/total,0.)
+        delta = np.where(total>0,z*np.sqrt(eff*(1.-eff)/total),0.)
+    return np.clip(eff-delta,0.,1.),np.clip(eff+delta,0.,1.)
+
+
+
+def effective_counts(passed,total,total_sumw2=None):
+    """
+    Passed & total counts for the intervals.  For weighted histograms, the effective
+    number of entries (sum w)^2/(sum w^2) in each bin of the total histogram is used
+    (both counts are scaled by (sum w)/(sum w^2), as in TEfficiency)
+    """
+    passed = np.asarray(passed,dtype=np.float64)
+    total  = np.asarray(total, dtype=np.float64)
+    if total_sumw2 is None: return passed,total
+
+    total_sumw2 = np.asarray(total_sumw2,dtype=np.float64)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        norm = np.where(total_sumw2>0,total/total_sumw2,0.)
+
+    return passed*norm,total*norm
+
+
+
+def efficiency(passed,total,method='clopper_pearson',level=default_level,alpha=1.,beta=1.):
+    """
+    Efficiency and asymmetric uncertainties for every bin in one pass.
+
+    @param passed    array of (effective) passed counts
+    @param total     array of (effective) total counts (same shape as 'passed')
+    @param method    'clopper_pearson','wilson','agresti_coull','normal',
+                     'jeffreys','uniform','bayesian' (prior Beta(alpha,beta)),
+                     or a TEfficiency statistic option (integer)
+    @param level     confidence level of the interval
+    Returns (efficiency, error_down, error_up) as distances from the efficiency
+    """
+    passed = np.asarray(passed,dtype=np.float64)
+    total  = np.asarray(total, dtype=np.float64)
+
+    method = root_statistic_options.get(method,method)
+    if method=='jeffreys':  alpha,beta = 0.5,0.5
+    elif method=='uniform': alpha,beta = 1.,1.
+
+    if method in ['feldman_cousins','mid_p']:
+        print " WARNING : Efficiency interval '{0}' is not supported.".format(method)
+        print "         : Using 'clopper_pearson'."
+        method = 'clopper_pearson'
+
+    bayesian_methods = ['jeffreys','uniform','bayesian']
+    if method in bayesian_methods+['clopper_pearson'] and not _scipy_available():
+        print " WARNING : scipy is needed for the '{0}' efficiency interval.".format(method)
+        print "         : Using 'wilson'."
+        method = 'wilson'
+
+    if method in bayesian_methods:
+        # posterior mean (TEfficiency::GetEfficiency for Bayesian statistics)
+        eff = (passed+alpha)/(total+alpha+beta)
+        lower,upper = bayesian(passed,total,level=level,alpha=alpha,beta=beta)
+    else:
+        with np.errstate(invalid='ignore',divide='ignore'):
+            eff = np.where(total>0,passed/total,0.)
+        intervals = {'clopper_pearson':clopper_pearson,'wilson':wilson,
+                     'agresti_coull':agresti_coull,'normal':normal}
+        try:
+            lower,upper = intervals[method](passed,total,level=level)
+        except KeyError:
+            print " WARNING : Unknown efficiency interval '{0}'.".format(method)
+            print "         : Using 'wilson'."
+            lower,upper = wilson(passed,total,level=level)
+
+    return eff,np.maximum(eff-lower,0.),np.maximum(upper-eff,0.)
+
+
+## THE END ##
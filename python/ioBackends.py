@@ -0,0 +1,172 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Registry of the IO backends (BaseIO subclasses) that convert input data into Hist objects.
+
+Each backend is registered by name with
+  - the class (or the module and class name, imported on first use),
+  - a probe to check if it can be used here (e.g., is ROOT installed?),
+  - a check of which inputs it can convert (to choose a backend for each input).
+Classes are imported and probes are run once per process, and the results are kept.
+
+Other backends can be added without modifying hepPlotter:
+
+    import ioBackends
+    ioBackends.register('parquet',klass=ParquetIO,
+                        accepts=lambda data: ioBackends.is_file(data,'.parquet'))
+"""
+import os
+import imp
+import importlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+
+def module_exists(name):
+    """Check if a module can be imported (without importing it)"""
+    try:
+        imp.find_module(name)
+        return True
+    except ImportError:
+        return False
+
+
+def is_file(data,extensions):
+    """File references "file.root:dir/hist" (or lists of them) with one of the 'extensions'"""
+    if isinstance(data,(list,tuple)) and data:
+        return all(is_file(d,extensions) for d in data)
+    if not isinstance(data,basestring): return False
+    return data.rsplit(':',1)[0].lower().endswith(extensions)
+
+
+def is_array(data):
+    """Arrays of data: numpy arrays, lists/tuples of values, {'x':x,'y':y}, or Hist objects"""
+    from hist import Hist
+    if hasattr(data,'_classname') or callable(getattr(data,'IsA',None)):
+        return False     # ROOT objects (uproot histograms are also lists of bin contents)
+    if isinstance(data,(list,tuple)) and data and all(isinstance(d,basestring) for d in data):
+        return False     # file references
+    if isinstance(data,(np.ndarray,Hist,list,tuple)): return True
+    return isinstance(data,dict) and 'x' in data and 'y' in data
+
+
+
+class Backend(object):
+    """An IO backend in the registry"""
+    def __init__(self,name,klass=None,module=None,classname=None,probe=None,accepts=None):
+        self.name      = name
+        self.klass     = klass       # BaseIO subclass (or None to import it from 'module')
+        self.module    = module
+        self.classname = classname
+        self.probe     = probe       # function returning True if the backend can be used
+        self.accepts   = accepts     # function returning True for data this backend converts
+
+        self._available = None       # result of the probe (run once)
+        return
+
+    def available(self):
+        """Check (once) if the backend can be used in this process"""
+        if self._available is None:
+            self._available = True if self.probe is None else bool(self.probe())
+        return self._available
+
+    def load(self):
+        """Return the class of the backend (imported once), or None if it cannot be used"""
+        if self.klass is None and self.available():
+            try:
+                self.klass = getattr(importlib.import_module(self.module),self.classname)
+            except (ImportError,AttributeError) as err:
+                print " WARNING : Cannot load backend '{0}': {1}".format(self.name,err)
+                self._available = False
+        return self.klass if self.available() else None
+
+    def converts(self,data):
+        """Check if this backend can convert 'data'"""
+        return self.accepts is not None and self.available() and bool(self.accepts(data))
+
+
+
+_backends = OrderedDict()     # name -> Backend, in order of preference
+
+
+def register(name,klass=None,module=None,classname=None,probe=None,accepts=None):
+    """
+    Register an IO backend (replaces an existing backend with the same name).
+
+    @param name         name used to select the backend, e.g., hist.backend = 'uproot'
+    @param klass        BaseIO subclass, or
+    @param module       module and
+    @param classname    class name, to import the class on first use
+    @param probe        (optional) function that returns True if the backend can be used here
+    @param accepts      (optional) function that returns True for data this backend converts
+    """
+    _backends[name] = Backend(name,klass=klass,module=module,classname=classname,
+                              probe=probe,accepts=accepts)
+    return
+
+
+def names():
+    """Names of the registered backends"""
+    return list(_backends.keys())
+
+
+def get(name):
+    """Return the class of a backend (None if it is unknown or not available here)"""
+    try:
+        backend = _backends[name]
+    except KeyError:
+        print " WARNING : Unknown backend '{0}'".format(name)
+        print "         : Registered backends: {0}".format(', '.join(names()))
+        return None
+
+    klass = backend.load()
+    if klass is None:
+        print " WARNING : Backend '{0}' is not available".format(name)
+
+    return klass
+
+
+def default():
+    """Name of the first available backend (in order of registration), or None"""
+    for name,backend in _backends.items():
+        if backend.available(): return name
+    return None
+
+
+def select(data,preferred=None):
+    """
+    Choose the backend for 'data': the preferred backend if it converts this data,
+    otherwise the first available backend that does, otherwise the preferred backend.
+    Returns the name of the backend (None if no backend is available)
+    """
+    if preferred in _backends and _backends[preferred].converts(data):
+        return preferred
+
+    for name,backend in _backends.items():
+        if backend.converts(data): return name
+
+    return default() if preferred is None else preferred
+
+
+
+## Backends distributed with hepPlotter (in order of preference)
+register('ROOT',module='rootIO',classname='RootIO',
+         probe=lambda: os.environ.get("ROOTSYS") is not None or module_exists('ROOT'),
+         accepts=lambda data: callable(getattr(data,'IsA',None)) or is_array(data) or is_file(data,'.root'))
+
+register('uproot',module='uprootIO',classname='UprootIO',
+         probe=lambda: module_exists('uproot'),
+         accepts=lambda data: hasattr(data,'_classname') or is_array(data) or is_file(data,'.root'))
+
+register('numpy',module='numpyIO',classname='NumpyIO',
+         accepts=lambda data: is_array(data) or is_file(data,('.npy','.npz')))
+
+
+## THE END ##
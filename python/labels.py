@@ -1,6 +1,6 @@
 """
 Created:        --
-Last Updated:   16 February  2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -8,11 +8,74 @@ Texas A&M University
 -----
 
 File for containing information about plotting.
+
+Text profiles:
+  'latex'  text is typeset by LaTeX (text.usetex in data/cms.mplstyle)
+  'fast'   text is drawn with matplotlib mathtext (no LaTeX run per label),
+           for high-volume plots where throughput matters more than typesetting
+Use set_text_profile() (or Plotter.text_profile) to choose; the label classes
+and tick labels produce strings for the current profile.
 """
 from array import array
 from collections import OrderedDict
 
 
+text_profile = 'latex'
+_latex_rcParams = {}     # rcParams replaced by the 'fast' profile (restored for 'latex')
+
+# mathtext with the regular sans-serif font, similar to LaTeX text with 'sansmath'
+fast_rcParams = {'text.usetex':False,
+                 'mathtext.fontset':'custom',
+                 'mathtext.rm':'sans',
+                 'mathtext.it':'sans:italic',
+                 'mathtext.bf':'sans:bold',
+                 'mathtext.default':'regular'}
+
+large_fontsize = 14.4    # size of \Large in LaTeX (article class): mathtext has no size commands
+
+
+
+## -- Functions for text in the current profile
+def set_text_profile(profile='latex'):
+    """Set the text profile ('latex' or 'fast') and the matching matplotlib rcParams"""
+    global text_profile
+    import matplotlib as mpl
+
+    if profile not in ['latex','fast']:
+        print " WARNING : Unknown text profile '{0}'".format(profile)
+        print "         : Using 'latex'."
+        profile = 'latex'
+
+    if profile=='fast' and text_profile!='fast':
+        _latex_rcParams.update( dict((k,mpl.rcParams[k]) for k in fast_rcParams) )
+        mpl.rcParams.update(fast_rcParams)
+    elif profile=='latex' and text_profile!='latex':
+        mpl.rcParams.update(_latex_rcParams)
+
+    text_profile = profile
+
+    return
+
+
+def text(string):
+    """Upright text inside math mode"""
+    return r"\text{%s}"%string if text_profile=='latex' else string
+
+def superscript(string):
+    """Superscript, e.g., exponents for tick labels and units"""
+    return r"$^{%s}$"%text(string)
+
+def bold(string):
+    """Bold text"""
+    return r"\textbf{%s}"%string if text_profile=='latex' else r"$\mathbf{%s}$"%string.replace(" ",r"\ ")
+
+def italic(string,large=False):
+    """Italic text (optionally \Large, with LaTeX; 'fast' text is sized by the Text object)"""
+    if text_profile=='latex':
+        return r"{\Large \textit{%s}}"%string if large else r"\textit{%s}"%string
+    return r"$\mathit{%s}$"%string.replace(" ",r"\ ")
+
+
 
 ## -- Classes for handling text on plots
 class Text(object):
@@ -82,13 +145,20 @@ class LumiStamp(Text):
     """Class for writing luminosity on plot"""
     def __init__(self,lumi="36.1"):
         Text.__init__(self)
-        self.text = r"%s fb$^{\text{-1}}$"%(lumi)
+        self.text = r"%s fb%s"%(lumi,superscript("-1"))
 
 class CMSStamp(Text):
     """Class for writing official CMS name & plot type (Simulation, Internal, etc.) on plot"""
     def __init__(self,label_status="Internal"):
         Text.__init__(self)
-        self.text = r"\textbf{CMS} {\Large \textit{%s}}"%(label_status)    # CMS style
+        self.text = bold("CMS")+" "+italic(label_status,large=True)    # CMS style
+
+        # 'fast' profile: the status is drawn as a second text with the size of \Large
+        self.status = None
+        self.status_fontsize = large_fontsize
+        if text_profile=='fast':
+            self.text   = bold("CMS")
+            self.status = italic(label_status)
 
 
 
@@ -0,0 +1,41 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Pure numpy backend: histograms arrays (or Hist objects) without ROOT or uproot.
+Files saved with numpy (.npy or .npz) can be referenced as "data.npz:jet_pt".
+"""
+import numpy as np
+from baseIO import BaseIO
+
+
+class NumpyIO(BaseIO):
+    def __init__(self,**kwargs):
+        BaseIO.__init__(self,**kwargs)
+
+    def convert(self,data):
+        """Convert arrays (or Hist objects) into uniform format"""
+        self._isHistogram  = False
+        self._isEfficiency = False
+        return self.convert_array(data)
+
+
+    def open_file(self,path):
+        """Open a .npy or .npz file (arrays are read when they are accessed)"""
+        return np.load(path,mmap_mode='r') if path.endswith('.npy') else np.load(path)
+
+    def close_file(self,handle):
+        close = getattr(handle,'close',None)
+        if close is not None: close()
+
+    def get_object(self,handle,name):
+        """Array 'name' in a .npz file (.npy files have one array: any name returns it)"""
+        if isinstance(handle,np.ndarray): return handle
+        return handle[name]
+
+
+## THE END ##
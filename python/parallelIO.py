@@ -0,0 +1,127 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Convert the same object from many files in a pool of processes,
+e.g., one histogram from each job of a Monte Carlo sample.
+Each worker returns a partial Hist and the parent merges them
+(contents and sum of weights squared are added) in the order of the files,
+so the totals are the same in every run.
+Partial histograms must have the same bin edges: TTrees and arrays are
+only converted with explicit bin edges (integer binning depends on the
+range of the data in each file).
+"""
+import multiprocessing
+
+import ioBackends
+
+
+
+def init_worker(max_memory=None):
+    """Limit the address space of each worker process (bytes)"""
+    if max_memory is None: return
+
+    import resource
+    resource.setrlimit(resource.RLIMIT_AS,(max_memory,max_memory))
+
+    return
+
+
+def convert_reference(args):
+    """Convert "file.root:name" into a Hist (runs in a worker process)"""
+    backend,reference,io_kwargs = args
+
+    io = ioBackends.get(backend)(**io_kwargs)
+
+    return io.convert_reference(reference)
+
+
+def explicit_binning(binning,dimensions=1):
+    """Check if 'binning' gives the bin edges of each axis (not a number of bins)"""
+    if dimensions==1:
+        return not isinstance(binning,(int,long))
+
+    try:
+        xbinning,ybinning = binning
+    except (TypeError,ValueError):
+        xbinning,ybinning = binning,binning
+
+    return not any(isinstance(b,(int,long)) for b in [xbinning,ybinning])
+
+
+def merge(hists):
+    """Sum an iterable of Hist objects with the same binning (raises ValueError otherwise)"""
+    total = None
+    for i,histo in enumerate(hists):
+        if total is None:
+            total = histo
+        elif not total.same_binning(histo):
+            raise ValueError("Cannot merge histogram {0}: its bin edges differ from the first histogram".format(i))
+        else:
+            total.Add(histo)
+    return total
+
+
+
+def convert_files(files,name,backend='uproot',nworkers=None,max_memory=None,**io_kwargs):
+    """
+    Convert the object 'name' (histogram or TTree) in each file and merge the results.
+
+    @param files         list of file paths
+    @param name          object in each file, e.g., "dir/hist" or "tree"
+    Other arguments are the same as convert_references()
+    """
+    references = [path+':'+name for path in files]
+    return convert_references(references,backend=backend,nworkers=nworkers,
+                              max_memory=max_memory,**io_kwargs)
+
+
+def convert_references(references,backend='uproot',nworkers=None,max_memory=None,**io_kwargs):
+    """
+    Convert objects referenced as "file.root:dir/hist" in a pool of processes and merge them.
+
+    @param references    list of "file.root:name" (same kind of object in each file)
+    @param backend       name of the backend in ioBackends, e.g., 'uproot' or 'ROOT'
+    @param nworkers      number of worker processes (default: number of CPUs, at most one per file);
+                         1 converts the files in this process
+    @param max_memory    maximum memory (bytes) for each worker process
+    @param io_kwargs     options for the backend, e.g., binning, rebin, normed, expression, ...
+                         (normalization -- a density for TTrees/arrays -- is applied after merging;
+                          TTrees and arrays need explicit bin edges, the same for all files)
+    Returns the merged Hist.  Raises ValueError if the files give different binnings
+    """
+    unbinned = io_kwargs.get('expression') is not None or backend=='numpy'
+    if unbinned:
+        if not explicit_binning(io_kwargs.get('binning',1),io_kwargs.get('dimensions',1)):
+            raise ValueError("Cannot merge TTrees or arrays from many files with integer binning "
+                             "({0}): each file would have its own range. Use explicit bin edges".format(io_kwargs.get('binning',1)))
+
+    normed = io_kwargs.pop('normed',False)
+    tasks  = [(backend,reference,io_kwargs) for reference in references]
+
+    if nworkers is None: nworkers = multiprocessing.cpu_count()
+    nworkers = max(1,min(nworkers,len(tasks)))
+
+    if nworkers==1:
+        total = merge(convert_reference(task) for task in tasks)
+    else:
+        pool = multiprocessing.Pool(nworkers,initializer=init_worker,initargs=(max_memory,))
+        try:
+            # merge the partial histograms in the order of the files (reproducible sums)
+            total = merge(pool.imap(convert_reference,tasks))
+        finally:
+            pool.close()
+            pool.join()
+
+    if total is not None and normed:
+        if unbinned: total.density()      # as for a single file of arrays/TTree
+        else:        total.normalize()
+
+    return total
+
+
+## THE END ##
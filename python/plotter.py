@@ -1,6 +1,6 @@
 """
 Created:         6 April     2016
-Last Updated:   13 July      2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -20,23 +20,35 @@ Base class for turning histograms or efficiency curves into plots
 """
 import os
 import sys
-import importlib
 from collections import OrderedDict
 
 import numpy as np
-import matplotlib.style
-import matplotlib as mpl
+
+import tools
+import labels
+import ioBackends
+import parallelIO
+import figureWriter
+
+# matplotlib is imported (and the style applied) in Plotter.initialize()
+plt    = tools.LazyModule('matplotlib.pyplot')
+ticker = tools.LazyModule('matplotlib.ticker')
 
 thisfile  = os.path.dirname(os.path.realpath(__file__))
 stylefile = thisfile.replace('python','data')+'/cms.mplstyle'
-mpl.style.use(stylefile)
+_style_loaded = False
 
-import matplotlib.pyplot as plt
-from matplotlib import gridspec
-from matplotlib.ticker import FormatStrFormatter,LogFormatterSciNotation
 
-import tools
-import labels
+def load_style():
+    """Apply the CMS style (once per process), before the first plot is made"""
+    global _style_loaded
+    if _style_loaded: return
+
+    import matplotlib.style
+    matplotlib.style.use(stylefile)
+    _style_loaded = True
+
+    return
 
 
 
@@ -103,13 +115,21 @@ class Plotter(object):
         self.plotLUMI = False
         self.CMSlabel = None                 # 'top left', 'top right' & 'outer' for 2D
         self.CMSlabelStatus = 'Internal'     # ('Simulation')+'Internal' || 'Preliminary'
-        self.format = 'pdf'                  # file format for saving image
+        self.format = 'pdf'                  # file format(s) for saving image: 'pdf', ['pdf','png'], or
+                                             # {'pdf':{},'png':{'dpi':100}} (savefig arguments per format)
+        self.async_save = False              # write the files in a writer process (see figureWriter.py)
+        self.save_stats = False              # print the size & time to write each file
+        self.rasterize  = None               # rasterize data-heavy artists in vector files (opt-in):
+                                             # True or {'vertices':20000,'artists':1000,'dpi':None} (dpi=None: savefig.dpi)
         self.saveAs = "result"               # save figure with name
         self.logplot = {"y":False,"x":False,"data":False}  # plot axes or data (2D) on log scale
 
         self.data_io = None
-        self.backend = None  # 'ROOT' or 'uproot'
+        self.backend = None  # 'ROOT', 'uproot', 'numpy', or another backend in ioBackends
+        self.nworkers   = 1         # processes for merging a list of file references (see parallelIO.py)
+        self.max_memory = None      # memory limit (bytes) of each of those processes
         self.format_minor_ticklabels = False
+        self.text_profile = 'latex'  # 'latex' or 'fast' (mathtext, no LaTeX run per label; see labels.py)
         self.text_coords = {'top left': {'x':[0.03]*3,        'y':[0.96,0.89,0.82]},\
                             'top right':{'x':[0.97]*3,        'y':[0.96,0.89,0.82]},\
                             'outer':    {'x':[0.02,0.99,0.99],'y':[1.0,1.0,0.9]}}
@@ -126,46 +146,34 @@ class Plotter(object):
 
         self.data2plot = OrderedDict()
 
-        if self.format!='pdf': 
+        load_style()
+        labels.set_text_profile(self.text_profile)
+
+        if 'pdf' not in self.formats():
             print " WARNING : Chosen format '{0}' may conflict with backend".format(self.format)
 
         if not self.axis_scale:
             self.axis_scale = {'y':1.4,'x':-1}
             if self.dimensions==2: self.axis_scale['y'] = 1.0
 
-        ## Load the backend
-        #  only support two 'backends' right now: "ROOT" and "uproot"
-        if self.backend == 'ROOT':
-            self.data_io = self.load_backend('rootIO','RootIO')
-        elif self.backend == 'uproot':
-            self.data_io = self.load_backend('uprootIO','UprootIO')
-            # methods for creating histograms from arrays are built into the uproot
-            # module because the structure is similar (both numpy-based)
-        else:
-            print " ERROR : Unknown backend '{0}' chosen.".format(self.backend)
-            print "       : Please set the backend to either 'ROOT' or 'uproot'."
-            rootsys = os.environ.get("ROOTSYS")
-            if rootsys is not None:
-                print " INFO  : Although, c++ ROOT seems to be available: "
-                print "       : > {0}".format(rootsys)
-                print " INFO  : Continuing with 'ROOT' as the backend."
-                print " INFO  : To avoid this message, please set the backend explicitly."
-                self.backend = 'ROOT'
-                self.data_io = self.load_backend('rootIO','RootIO')
+        ## Load the backend (classes and availability are resolved once per process, see ioBackends.py)
+        if self.backend is None:
+            self.backend = ioBackends.default()
+            if self.backend is None:
+                print " ERROR : No backend is available (registered: {0})".format(', '.join(ioBackends.names()))
             else:
-                try:
-                    import uproot
-                except ImportError:
-                    print " ERROR : Cannot find 'ROOT' or 'uproot'. Exiting."
-                    sys.exit(1)
-                self.backend = 'uproot'
-                self.data_io = self.load_backend('uprootIO','UprootIO')
-        return
+                print " INFO  : No backend chosen. Continuing with '{0}' as the backend.".format(self.backend)
+                print " INFO  : To avoid this message, please set the backend explicitly."
 
+        self.data_io = ioBackends.get(self.backend) if self.backend is not None else None
+        if self.data_io is None and self.backend is not None:
+            default = ioBackends.default()
+            if default is not None:
+                print " INFO  : Continuing with '{0}' as the backend.".format(default)
+                self.backend = default
+                self.data_io = ioBackends.get(default)
 
-    def load_backend(self,module,klassname):
-        """Load the backend to access ROOT data"""
-        return getattr(importlib.import_module(module),klassname)
+        return
 
 
 
@@ -206,26 +214,30 @@ class Plotter(object):
     def Add(self,data,name='',weights=None,**kwargs):
         """
         Add histogram data for this figure.
-        @param data             data for plot (python array or ROOT TH1)
+        @param data             data for plot (python array, ROOT TH1, or hist.Hist, e.g., from Hist.fill())
+                                or a reference "file.root:dir/hist" (files & histograms are cached)
+                                or a list of references to sum (converted in 'nworkers' processes)
         @param name             name to identify histogram object
-        @param weights          weights for making histogram data
+        @param weights          weights for making histogram data (branch name for a TTree)
         @param kwargs           arguments for matplotlib options
-                   -- hist:     https://matplotlib.org/api/_as_gen/matplotlib.pyplot.hist.html
-                   -- hist2d:   https://matplotlib.org/api/_as_gen/matplotlib.pyplot.hist2d.html
+                                (and 'expression','selection','entrystart','entrystop','entrysteps'
+                                 for histogramming a TTree with uproot, see UprootIO.tree2data)
+                   -- hist:     https://matplotlib.org/api/_as_gen/matplotlib.patches.Polygon.html
+                   -- hist2d:   https://matplotlib.org/api/_as_gen/matplotlib.pyplot.pcolormesh.html
+                                (or imshow for uniform binning; 'cmin','cmax' as in pyplot.hist2d)
                    -- errorbar: https://matplotlib.org/api/_as_gen/matplotlib.pyplot.errorbar.html
                    -- lineplot: https://matplotlib.org/api/_as_gen/matplotlib.pyplot.plot.html
         """
         hist = PlotterData(name)
 
+        # options for histogramming a TTree (not matplotlib arguments)
+        tree_kwargs = dict( (k,kwargs.pop(k)) for k in ['expression','selection','entrystart',
+                            'entrystop','entrysteps'] if k in kwargs )
+
         self.setParameters(hist,**kwargs)     # set parameters based on kwargs
 
-        io_kwargs = {"dimensions":self.dimensions,
-                     "rebin":self.rebin,
-                     "normed":hist.normed,
-                     "binning":self.binning,
-                     "weights":weights}
-        io        = self.data_io(**io_kwargs)
-        hist.data = io.convert(data)
+        hist.data,io = self.convert(data,name=name,weights=weights,normed=hist.normed,**tree_kwargs)
+        if io is None: return
 
         if io.isTH1() and not kwargs.get("isTH1",False):     hist.isTH1  = True
         elif io.isTEff() and not kwargs.get("isTEff",False): hist.isTEff = True
@@ -235,6 +247,38 @@ class Plotter(object):
         return
 
 
+    def convert(self,data,name='',weights=None,normed=False,**tree_kwargs):
+        """
+        Convert 'data' (any input of Add()) into a Hist with the backend that can read it.
+        Returns the Hist and the backend object (None,None if no backend can convert it)
+        """
+        io_kwargs = {"dimensions":self.dimensions,
+                     "rebin":self.rebin,
+                     "normed":normed,
+                     "binning":self.binning,
+                     "weights":weights}
+        io_kwargs.update(tree_kwargs)
+
+        # the backend depends on the input, e.g., a ROOT histogram with the 'uproot' backend
+        backend  = ioBackends.select(data,preferred=self.backend)
+        io_class = ioBackends.get(backend) if backend is not None else None
+        if io_class is None:
+            print " ERROR : No backend can convert '{0}' ({1})".format(name,type(data).__name__)
+            return None,None
+        io = io_class(**io_kwargs)
+        if isinstance(data,basestring):
+            h_data = io.convert_reference(data)
+        elif isinstance(data,(list,tuple)) and data and all(isinstance(d,basestring) for d in data):
+            # sum the same object from many files, e.g., jobs of one MC sample
+            h_data = parallelIO.convert_references(data,backend=backend,nworkers=self.nworkers,
+                                                   max_memory=self.max_memory,**io_kwargs)
+            io._isHistogram = True
+        else:
+            h_data = io.convert(data)
+
+        return h_data,io
+
+
 
     def execute(self):
         """Execute the plot.  Done in inherited class"""
@@ -296,10 +340,10 @@ class Plotter(object):
 
     def set_ticklabels(self,axis_ticks,axis="y"):
         """Set tick labels (major and minor) for x/y-axes"""
-        formatter  = FormatStrFormatter('%g')
+        formatter  = ticker.FormatStrFormatter('%g')
         tlabels  = {'major':None}
         if self.logplot[axis]:
-            tlabels['major'] = [r"10$^{\text{%s}}$"%(int(np.log10(i))) if i>0 else '' for i in axis_ticks['major']]
+            tlabels['major'] = ["10"+labels.superscript(int(np.log10(i))) if i>0 else '' for i in axis_ticks['major']]
             if axis=="y": tlabels['major'] = ["",""]+tlabels['major'][2:]
 
             if self.format_minor_ticklabels:
@@ -307,7 +351,7 @@ class Plotter(object):
                 for m,mtl in enumerate(axis_ticks['minor']):
                     mtl_sci = format(mtl,'.0e').split("e")
                     mtl_exp = int(mtl_sci[1])
-                    mtlabels.append( mtl_sci[0]+r'$\times$10$^\text{%d}$'%mtl_exp )
+                    mtlabels.append( mtl_sci[0]+r'$\times$10'+labels.superscript(mtl_exp) )
                 tlabels['minor'] = mtlabels
         else:
             tlabels['major'] = [formatter(i) for i in axis_ticks['major']]
@@ -316,6 +360,28 @@ class Plotter(object):
         return tlabels
 
 
+    def draw_cms_status(self,axis,cms_stamp):
+        """
+        Draw "CMS" and the status (e.g., Internal) as two texts with their own sizes
+        ('fast' text profile), aligned on their baselines like the LaTeX label
+        """
+        from matplotlib.offsetbox import AnchoredOffsetbox,HPacker,TextArea
+
+        texts = [TextArea(cms_stamp.text,textprops={'fontsize':cms_stamp.fontsize,'color':cms_stamp.color}),
+                 TextArea(cms_stamp.status,textprops={'fontsize':cms_stamp.status_fontsize,'color':cms_stamp.color})]
+        packer = HPacker(children=texts,align='baseline',pad=0,sep=0.25*cms_stamp.status_fontsize)
+
+        vertical   = {'top':'upper','bottom':'lower'}.get(cms_stamp.va,'center')
+        horizontal = {'left':'left','right':'right'}.get(cms_stamp.ha,'center')
+        location   = 'center' if vertical==horizontal else vertical+' '+horizontal
+
+        anchored = AnchoredOffsetbox(location,child=packer,pad=0,borderpad=0,frameon=False,
+                                     bbox_to_anchor=tuple(cms_stamp.coords),bbox_transform=axis.transAxes)
+        axis.add_artist(anchored)
+
+        return
+
+
     def text_labels(self,axis=None):
         """Labels for CMS plots"""
         if self.dimensions==2 and self.CMSlabel!='outer':
@@ -348,8 +414,11 @@ class Plotter(object):
         lumi_stamp.va = 'bottom'
 
 
-        axis.text(cms_stamp.coords[0],cms_stamp.coords[1],cms_stamp.text,fontsize=cms_stamp.fontsize,
-                      ha=cms_stamp.ha,va=cms_stamp.va,transform=axis.transAxes)
+        if cms_stamp.status is None:
+            axis.text(cms_stamp.coords[0],cms_stamp.coords[1],cms_stamp.text,fontsize=cms_stamp.fontsize,
+                          ha=cms_stamp.ha,va=cms_stamp.va,transform=axis.transAxes)
+        else:
+            self.draw_cms_status(axis,cms_stamp)
 
         energy_lumi_text = energy_stamp.text+", "+lumi_stamp.text if self.plotLUMI else energy_stamp.text
         axis.text(energy_stamp.coords[0],energy_stamp.coords[1],energy_lumi_text,
@@ -368,12 +437,47 @@ class Plotter(object):
 
 
 
+    def formats(self):
+        """File formats for saving the figure, with extra savefig arguments for each"""
+        formats = self.format
+        if isinstance(formats,basestring): formats = formats.split(',')
+        if not isinstance(formats,dict):   formats = OrderedDict( (f.strip(),{}) for f in formats )
+        return formats
+
+
     def savefig(self,**kwargs):
-        """Save the figure. Use kwargs to modify arguments from style file"""
-        plt.savefig(self.saveAs+'.'+self.format,**kwargs)
-        plt.close()
+        """
+        Save the figure in each format of 'self.format'.
+        Use kwargs to modify arguments from style file.
+        With 'self.async_save', the files are written in a writer process;
+        call figureWriter.wait() to wait for them (and raise errors).
+        Returns the size & time to write each file (None with 'self.async_save')
+        """
+        fig      = plt.gcf()
+        template = getattr(self,'template',False)   # templates keep the figure for the next plot
+        formats  = self.formats()
+
+        filenames = OrderedDict( (self.saveAs+'.'+format,dict(format_kwargs)) for format,format_kwargs in formats.items() )
+
+        vector_files = [f for f in filenames if f.rsplit('.',1)[-1].lower() in figureWriter.vector_formats]
+        if self.rasterize and vector_files:
+            raster_opts = self.rasterize if isinstance(self.rasterize,dict) else {}
+            nrasterized = figureWriter.rasterize(fig,max_vertices=raster_opts.get('vertices',20000),
+                                                 max_artists=raster_opts.get('artists',1000))
+            if nrasterized and raster_opts.get('dpi') is not None:
+                for filename in vector_files:
+                    filenames[filename].setdefault('dpi',raster_opts['dpi'])   # resolution of the rasterized artists
+
+        stats = None
+        if self.async_save and not template:
+            plt.close(fig)         # the writer owns the figure now
+            figureWriter.writer().submit(fig,filenames,verbose=self.save_stats,**kwargs)
+        else:
+            stats = figureWriter.save(fig,filenames,verbose=self.save_stats,**kwargs)
+            if not template:
+                plt.close(fig)
 
-        return
+        return stats
 
 
 ## THE END
@@ -0,0 +1,88 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Ratios (or significances) of many numerator/denominator pairs in one pass.
+Inputs are (pairs x bins) arrays; bins where the value is undefined
+(zero or non-finite denominator, non-finite numerator) are masked explicitly
+instead of producing (and later patching) inf/NaN values.
+
+Propagation of the uncertainties:
+  'numerator'   only the numerator uncertainty (the denominator is the reference)
+  'both'        numerator and denominator uncertainties (uncorrelated)
+  'binomial'    numerator is a subset of the denominator (as TH1::Divide(...,"B"))
+"""
+import numpy as np
+
+
+error_options = ['numerator','both','binomial']
+
+
+
+def _propagate(option,num,den,num_err,den_err,content,value='ratio'):
+    """Uncertainty of 'content' (num/den or num/sqrt(den)) for one propagation option"""
+    if value=='significance':
+        # s = num/sqrt(den):  ds^2 = (num_err^2 + (num*den_err/(2den))^2)/den
+        variance = np.square(num_err)
+        if option!='numerator':
+            variance = variance + np.square(num*den_err/(2*den))
+        return np.sqrt(variance/den)
+
+    # r = num/den
+    if option=='numerator':
+        variance = np.square(num_err)
+    elif option=='both':
+        variance = np.square(num_err) + np.square(content*den_err)
+    else:
+        variance = np.abs( (1-2*content)*np.square(num_err) + np.square(content*den_err) )
+
+    return np.sqrt(variance)/np.abs(den)
+
+
+def divide(num,den,num_err=None,den_err=None,errors='numerator',value='ratio'):
+    """
+    Ratios of all (numerator,denominator) pairs at once.
+
+    @param num,den            (pairs x bins) arrays (or one pair: arrays of bins)
+    @param num_err,den_err    uncertainties with the same shape (default: none)
+    @param errors             'numerator','both','binomial' (or a list with one option per pair)
+    @param value              'ratio' (num/den) or 'significance' (num/sqrt(den))
+    Returns (content,error,mask): 'mask' is True where the value is undefined
+    (content and error are NaN there)
+    """
+    num = np.atleast_2d( np.asarray(num,dtype=np.float64) )
+    den = np.atleast_2d( np.asarray(den,dtype=np.float64) )
+    num_err = np.zeros_like(num) if num_err is None else np.atleast_2d( np.asarray(num_err,dtype=np.float64) )
+    den_err = np.zeros_like(den) if den_err is None else np.atleast_2d( np.asarray(den_err,dtype=np.float64) )
+
+    defined = np.isfinite(num) & np.isfinite(den)
+    defined &= (den>0) if value=='significance' else (den!=0)
+    mask = ~defined
+
+    content = np.full(num.shape,np.nan)
+    error   = np.full(num.shape,np.nan)
+
+    with np.errstate(divide='ignore',invalid='ignore'):
+        scale = np.sqrt(den[defined]) if value=='significance' else den[defined]
+        content[defined] = num[defined] / scale
+
+        options = np.broadcast_to( np.asarray(errors,dtype=object),(num.shape[0],) )
+        for option in set(options):
+            if option not in error_options:
+                print " WARNING : Unsupported uncertainty '{0}' for ratios ({1}).".format(option,', '.join(error_options))
+                print "         : Using 'numerator'."
+
+            rows = np.zeros_like(mask)
+            rows[options==option] = True
+            rows &= defined
+            error[rows] = _propagate(option if option in error_options else 'numerator',
+                                     num[rows],den[rows],num_err[rows],den_err[rows],content[rows],value=value)
+
+    return content,error,mask
+
+
+## THE END ##
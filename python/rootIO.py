@@ -1,6 +1,6 @@
 """
 Created:        17 October   2018
-Last Updated:   19 October   2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -9,10 +9,57 @@ daniel.edison.marley@cernSPAMNOT.ch
 Simple functions to help accessing data with c++ ROOT
 """
 import numpy as np
-import ROOT
+import tools
+import intervals
 from hist import Hist
 from baseIO import BaseIO
 
+ROOT = tools.LazyModule('ROOT')   # imported when the first ROOT object is converted
+
+
+# numpy types of the storage behind each kind of histogram (TH1F inherits from TArrayF, etc.)
+_array_dtypes = [('TArrayD',np.float64),('TArrayF',np.float32),('TArrayI',np.int32),
+                 ('TArrayS',np.int16),('TArrayC',np.int8)]
+
+
+def root_array(array,dtype=np.float64,size=None):
+    """View the buffer of a ROOT TArray (or histogram inheriting from one) as a numpy array (no copy)"""
+    if size is None: size = array.GetSize()
+    if not size: return np.array([],dtype=dtype)
+
+    buffer = array.GetArray()
+    try:
+        buffer.SetSize(size)           # PyROOT buffers don't always know their length
+    except AttributeError:
+        pass
+
+    return np.frombuffer(buffer,dtype=dtype,count=size)
+
+
+def hist_arrays(histo):
+    """
+    Return views of the bin contents and sum of weights squared, including under/overflow,
+    in ROOT's global bin order.  The sumw2 falls back to the contents if it isn't stored.
+    """
+    ncells = histo.GetNcells()
+    dtype  = next((d for name,d in _array_dtypes if histo.InheritsFrom(name)),np.float64)
+
+    content = root_array(histo,dtype,ncells)
+    if histo.GetSumw2N():
+        sumw2 = root_array(histo.GetSumw2(),np.float64,ncells)
+    else:
+        sumw2 = np.abs(content)
+
+    return content,sumw2
+
+
+def axis_edges(axis):
+    """Return the bin edges of a TAxis (stored only for variable binning)"""
+    xbins = axis.GetXbins()
+    if xbins.GetSize():
+        return np.array(root_array(xbins))
+    return np.linspace(axis.GetXmin(),axis.GetXmax(),axis.GetNbins()+1)
+
 
 class RootIO(BaseIO):
     def __init__(self,**kwargs):
@@ -43,140 +90,71 @@ class RootIO(BaseIO):
         return h_data
 
 
+    def open_file(self,path):
+        """Open a ROOT file (local or remote, e.g., root://)"""
+        return ROOT.TFile.Open(path)
+
+    def close_file(self,handle):
+        handle.Close()
+
+    def get_object(self,handle,name):
+        return handle.Get(name)
+
+
     def hist2data(self,histogram,normed=False,reBin=None):
-        """Convert ROOT histogram for internal use."""
-        results = Hist()
+        """
+        Convert ROOT histogram for internal use.
+        The contents & sumw2 are read in bulk from the ROOT buffers (one copy, no clone);
+        re-binning and normalizing are done on the arrays.
+        """
+        content,sumw2 = hist_arrays(histogram)
 
-        histo = histogram.Clone()
-        if not histo.GetSumw2N():
-            histo.Sumw2()
+        results = Hist()
+        results.set_bins( axis_edges(histogram.GetXaxis()) )
+        results.content = np.array(content[1:-1],dtype=np.float64)   # remove under/overflow
+        results.sumw2   = np.array(sumw2[1:-1],  dtype=np.float64)
+        results.error   = np.sqrt(results.sumw2)
 
         if reBin is not None:
-            # Use ROOT functionality to re-bin histogram
-            try:
-                histo.Rebin(reBin)
-            except TypeError:
-                newname = histo.GetName()+"_"
-                histo.Rebin(len(reBin)-1,newname,reBin)
-                histo = ROOT.gROOT.FindObject( newname )
-
-        if normed:
-            integral = histo.Integral()
-            histo.Scale(1./integral)
-
-        bin_centers  = []
-        bin_contents = []
-        bin_errors   = []
-        bin_widths   = []
-        bin_edges    = [histo.GetXaxis().GetBinLowEdge(1)]
-
-        for i in xrange(1,histo.GetNbinsX()+1):
-            bin_edges.append(histo.GetXaxis().GetBinUpEdge(i))
-            bin_centers.append(histo.GetBinCenter(i))
-            bin_contents.append(histo.GetBinContent(i))
-            bin_errors.append(histo.GetBinError(i))
-            bin_widths.append(histo.GetXaxis().GetBinWidth(i)*0.5)
-
-        results.content = np.array(bin_contents)
-        results.error   = np.array(bin_errors)
-        results.bins    = np.array(bin_edges)
-        results.center  = bin_centers
-        results.width   = bin_widths
+            results.Rebin(reBin)
+        if normed: results.normalize()
 
         return results
 
     def hist2data2D(self,histogram,normed=False,reBin=None):
-        """Convert ROOT histogram for internal use."""
-        results = Hist()
+        """
+        Convert ROOT histogram for internal use.
+        The contents & sumw2 are read in bulk from the ROOT buffers and reshaped to
+        (nbinsx,nbinsy) without the flow bins; re-binning is done on the arrays.
+        """
+        nbinsx = histogram.GetNbinsX()
+        nbinsy = histogram.GetNbinsY()
+        content,sumw2 = hist_arrays(histogram)
+
+        # ROOT global bin = binx + (nbinsx+2)*biny
+        content = content.reshape(nbinsy+2,nbinsx+2)[1:-1,1:-1].T
+        sumw2   = sumw2.reshape(nbinsy+2,nbinsx+2)[1:-1,1:-1].T
 
-        histo = histogram.Clone()
-        if not histo.GetSumw2N():
-            histo.Sumw2()
+        results = Hist()
+        results.set_bins({'x':axis_edges(histogram.GetXaxis()),'y':axis_edges(histogram.GetYaxis())})
+        results.content = np.array(content,dtype=np.float64).flatten()
+        results.sumw2   = np.array(sumw2,  dtype=np.float64).flatten()
+        results.error   = np.sqrt(results.sumw2)
 
         if reBin is not None:
-            # Use ROOT functionality to re-bin histogram
-            if isinstance(reBin, (int,long)):
-                histo.Rebin2D(reBin,reBin)
-            else:
-                newname   = histo.GetName()+"_"
-                old_histo = histo.Clone()             # special rebinning, redefine histo
-                try:
-                    new_x = reBin['x']
-                    new_y = reBin['y']
-                except TypeError:
-                    new_x = reBin[0]
-                    new_y = reBin[1]
-                histo = ROOT.TH2F(old_histo.GetName()+newname,old_histo.GetTitle()+newname,len(new_x)-1,new_x,len(new_y)-1,new_y)
-                xaxis = old_histo.GetXaxis()
-                yaxis = old_histo.GetYaxis()
-                for i in xrange(1,xaxis.GetNbins()):
-                    for j in xrange(1,yaxis.GetNbins()):
-                        histo.Fill(xaxis.GetBinCenter(i),yaxis.GetBinCenter(j),old_histo.GetBinContent(i,j) )
-
-        if normed:
-            integral = histo.Integral()
-            histo.Scale(1./integral)
-
-        bin_centers  = {'x':[],'y':[]}
-        bin_contents = []
-        bin_errors   = []
-        bin_widths   = {'x':[],'y':[]}
-        bin_edges    = {'x':[histo.GetXaxis().GetBinLowEdge(1)],\
-                        'y':[histo.GetYaxis().GetBinLowEdge(1)]}
-        bin_edges['x']+=[histo.GetXaxis().GetBinUpEdge(i) for i in xrange(1,histo.GetNbinsX()+1)]
-        bin_edges['y']+=[histo.GetYaxis().GetBinUpEdge(j) for j in xrange(1,histo.GetNbinsY()+1)]
-
-        for i in xrange(1,histo.GetNbinsX()+1):
-            for j in xrange(1,histo.GetNbinsY()+1):
-                bin_contents.append(histo.GetBinContent(i,j))
-                bin_errors.append(histo.GetBinError(i,j))
-                bin_centers['x'].append(histo.GetXaxis().GetBinCenter(i))
-                bin_centers['y'].append(histo.GetYaxis().GetBinCenter(j))
-                bin_widths['x'].append(histo.GetXaxis().GetBinWidth(i)*0.5)
-                bin_widths['y'].append(histo.GetYaxis().GetBinWidth(i)*0.5)
-
-        results.content = np.array(bin_contents)
-        results.error   = np.array(bin_errors)
-
-        results.xbins   = np.array(bin_edges['x'])
-        results.ybins   = np.array(bin_edges['y'])
-        results.xcenter = bin_centers['x']
-        results.ycenter = bin_centers['y']
-        results.xwidth  = bin_widths['x']
-        results.ywidth  = bin_widths['y']
-
-        results.bins    = {'x':results.xbins, 'y':results.ybins}
-        results.center  = bin_centers
-        results.width   = bin_widths
+            results.Rebin2D(reBin)
+        if normed: results.normalize()
 
         return results
 
 
     def TEfficiency2data(self,histo):
         """Convert TEfficiency to internal format. No support for re-binning TEfficiencies."""
-        h_histo  = histo.GetPassedHistogram()
-
-        bin_contents  = []
-        bin_errors_up = []
-        bin_errors_dn = []
-        bin_centers   = []
-        bin_widths    = []
-        bin_edges     = [h_histo.GetXaxis().GetBinLowEdge(1)]
-
-        for i in xrange(1,h_histo.GetNbinsX()+1):
-            bin_contents.append(histo.GetEfficiency(i))
-            bin_errors_up.append(histo.GetEfficiencyErrorUp(i))
-            bin_errors_dn.append(histo.GetEfficiencyErrorLow(i))
-            bin_centers.append(h_histo.GetXaxis().GetBinCenter(i))
-            bin_edges.append(h_histo.GetXaxis().GetBinUpEdge(i))
-            bin_widths.append(h_histo.GetXaxis().GetBinWidth(1)/2.)
+        passed,total = self.TEfficiency_arrays(histo)
 
         results = Hist()
-        results.content = np.array(bin_contents)
-        results.error   = [bin_errors_dn,bin_errors_up]
-        results.bins    = np.array(bin_edges)
-        results.center  = bin_centers
-        results.width   = bin_widths
+        results.set_bins( axis_edges(histo.GetTotalHistogram().GetXaxis()) )
+        self.TEfficiency_values(histo,passed[1:-1],total[1:-1],results)
 
         return results
 
@@ -184,39 +162,45 @@ class RootIO(BaseIO):
 
     def TEfficiency2data2D(self,histo):
         """Convert 2D TEfficiency to internal format. No support for re-binning TEfficiencies."""
-        h_histo  = histo.GetPassedHistogram()
-
-        bin_centers   = {'x':[],'y':[]}
-        bin_contents  = []
-        bin_error_ups = [] # eff uncertainty up
-        bin_error_dns = [] # eff uncertainty down
-        bin_widths    = {'x':[],'y':[]}
-
-        binns = {'x':[h_histo.GetXaxis().GetBinLowEdge(1)],\
-                 'y':[h_histo.GetYaxis().GetBinLowEdge(1)]}
-        bin_edges['x']+=[h_histo.GetXaxis().GetBinUpEdge(i) for i in xrange(1,h_histo.GetNbinsX()+1)]
-        bin_edges['y']+=[h_histo.GetYaxis().GetBinUpEdge(j) for j in xrange(1,h_histo.GetNbinsY()+1)]
-
-        for i in xrange(1,h_histo.GetNbinsX()+1):
-            for j in xrange(1,h_histo.GetNbinsY()+1):
-                bin_center['x'].append(h_histo.GetXaxis().GetBinCenter(i))
-                bin_center['y'].append(h_histo.GetYaxis().GetBinCenter(j))
-
-                this_bin = histo.GetGlobalBin(i,j)
-                bin_contents.append(histo.GetEfficiency(this_bin))
-                bin_error_ups.append(histo.GetEfficiencyErrorUp(this_bin))
-                bin_error_dns.append(histo.GetEfficiencyErrorLow(this_bin))
-                bin_widths['x'].append(h_histo.GetXaxis().GetBinWidth(1)/2.)
-                bin_widths['y'].append(h_histo.GetYaxis().GetBinWidth(1)/2.)
+        passed,total = self.TEfficiency_arrays(histo)
+
+        h_total = histo.GetTotalHistogram()
+        nbinsx  = h_total.GetNbinsX()
+        nbinsy  = h_total.GetNbinsY()
+
+        # ROOT global bin = binx + (nbinsx+2)*biny -> (nbinsx,nbinsy) without under/overflow
+        passed = passed.reshape(nbinsy+2,nbinsx+2)[1:-1,1:-1].T.flatten()
+        total  = total.reshape(nbinsy+2,nbinsx+2)[1:-1,1:-1].T.flatten()
 
         results = Hist()
-        results.content = np.array(bin_contents)
-        results.error   = [np.array(bin_error_dns),np.array(bin_error_ups)]
-        results.bins    = {'x':np.array(bin_edges['x']),'y':np.array(bin_edges['y'])}
-        results.center  = bin_centers
-        results.width   = bin_widths
+        results.set_bins({'x':axis_edges(h_total.GetXaxis()),'y':axis_edges(h_total.GetYaxis())})
+        self.TEfficiency_values(histo,passed,total,results)
 
         return results
 
 
+    def TEfficiency_arrays(self,histo):
+        """
+        Passed & total counts of a TEfficiency (all cells) read in bulk.
+        For weighted TEfficiencies, the effective number of entries is used:
+        (sum w)^2/(sum w^2) in each bin of the total histogram.
+        """
+        passed,passed_sumw2 = hist_arrays(histo.GetPassedHistogram())
+        total,total_sumw2   = hist_arrays(histo.GetTotalHistogram())
+        return intervals.effective_counts(passed,total,total_sumw2 if histo.UsesWeights() else None)
+
+
+    def TEfficiency_values(self,histo,passed,total,results):
+        """Compute efficiencies & asymmetric errors for all bins using the TEfficiency statistic option"""
+        eff,err_dn,err_up = intervals.efficiency(passed,total,
+                                                 method=histo.GetStatisticOption(),
+                                                 level=histo.GetConfidenceLevel(),
+                                                 alpha=histo.GetBetaAlpha(),
+                                                 beta=histo.GetBetaBeta())
+        results.content = eff
+        results.error   = [err_dn,err_up]
+
+        return
+
+
 ## THE END ##
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Systematic uncertainties of a prediction (sum of samples) from up/down variations
+of each sample for each nuisance, in one pass over (samples x nuisances x bins) arrays.
+
+  shift_up   = up   - nominal    (samples x nuisances x bins; 0 if a sample has no variation)
+  shift_down = down - nominal
+
+Correlated nuisances shift every sample together: their shifts are added linearly
+across samples before they are combined.  Uncorrelated nuisances are independent in each sample.
+The (independent) shifts of the total are then combined in quadrature with
+  'symmetrize'  half the difference between the up & down shifts (symmetric uncertainty)
+  'envelope'    largest upward & downward shift in each bin (asymmetric uncertainty)
+"""
+import numpy as np
+
+
+methods = ['symmetrize','envelope']
+
+
+
+def total_shifts(shift_up,shift_down,correlated=True):
+    """
+    Shifts of the total prediction for each independent variation: (variations x bins).
+    Correlated nuisances are summed over samples; uncorrelated nuisances give
+    one variation per sample.
+    """
+    nsamples,nnuisances,nbins = shift_up.shape
+    correlated = np.broadcast_to( np.asarray(correlated,dtype=bool),(nnuisances,) )
+
+    up   = [shift_up[:,correlated].sum(axis=0),   shift_up[:,~correlated].reshape(-1,nbins)]
+    down = [shift_down[:,correlated].sum(axis=0), shift_down[:,~correlated].reshape(-1,nbins)]
+
+    return np.concatenate(up),np.concatenate(down)
+
+
+def uncertainty(shift_up,shift_down=None,correlated=True,method='symmetrize'):
+    """
+    Systematic uncertainty of the total prediction in each bin.
+
+    @param shift_up      (samples x nuisances x bins) shifts of the up variations
+    @param shift_down    shifts of the down variations (default: -shift_up, one-sided variations)
+    @param correlated    bool, or one bool per nuisance
+    @param method        'symmetrize' or 'envelope'
+    Returns (down,up): positive uncertainties in each bin
+    """
+    shift_up = np.asarray(shift_up,dtype=np.float64)
+    shift_down = -shift_up if shift_down is None else np.asarray(shift_down,dtype=np.float64)
+
+    up,down = total_shifts(shift_up,shift_down,correlated=correlated)
+
+    if method=='envelope':
+        upper = np.maximum(np.maximum(up,down),0)
+        lower = np.maximum(np.maximum(-up,-down),0)
+        return np.sqrt(np.sum(np.square(lower),axis=0)),np.sqrt(np.sum(np.square(upper),axis=0))
+
+    if method!='symmetrize':
+        print " WARNING : Unsupported method '{0}' for systematic uncertainties ({1}).".format(method,', '.join(methods))
+        print "         : Using 'symmetrize'."
+
+    symmetric = np.sqrt( np.sum(np.square(0.5*(up-down)),axis=0) )
+
+    return symmetric,symmetric
+
+
+## THE END ##
@@ -1,6 +1,6 @@
 """
 Created:         1 September 2016
-Last Updated:   19 October   2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -9,9 +9,27 @@ Texas A&M University
 
 Simple functions to help with plotting & accessing data
 """
+import importlib
 import numpy as np
 
 
+class LazyModule(object):
+    """
+    Stand-in for a module that is only imported when it is first used, e.g.,
+      plt = LazyModule('matplotlib.pyplot')
+    keeps matplotlib (or ROOT, scipy) out of the time it takes to import hepPlotter.
+    """
+    def __init__(self,name):
+        self.__dict__['_name']   = name
+        self.__dict__['_module'] = None
+
+    def __getattr__(self,attr):
+        if self._module is None:
+            self.__dict__['_module'] = importlib.import_module(self._name)
+        return getattr(self._module,attr)
+
+
+
 def midpoints(data):
     """Return the midpoint of bins given the bin edges"""
     return 0.5*(data[:-1]+data[1:])
@@ -20,6 +38,41 @@ def widths(data):
     """Return half the width of bins given the bin edges"""
     return 0.5*(data[1:]-data[:-1])
 
+def bin_edges(data,binning):
+    """
+    Return the bin edges for an array of data (same conventions as numpy.histogram).
+    An integer 'binning' makes that many uniform bins spanning the range of the data.
+    """
+    if isinstance(binning,(int,long)):
+        data = np.asarray(data)
+        data = data[np.isfinite(data)]
+        lo,hi = (np.min(data),np.max(data)) if data.size else (0.,1.)
+        if lo==hi: lo,hi = lo-0.5,hi+0.5
+        return np.linspace(lo,hi,binning+1)
+
+    return np.asarray(binning,dtype=np.float64)
+
+def bin_edges2D(xdata,ydata,binning):
+    """
+    Return the x and y bin edges for 2D data (same conventions as numpy.histogram2d):
+    an integer, a pair [x,y] of integers/edges, or one list of edges for both axes.
+    """
+    try:
+        xbinning,ybinning = binning
+    except (TypeError,ValueError):
+        xbinning,ybinning = binning,binning
+
+    return bin_edges(xdata,xbinning),bin_edges(ydata,ybinning)
+
+def density_factor(content,bins):
+    """
+    Per-bin factor that turns bin contents into a density (integral of 1),
+    i.e., 1/(sum of contents * bin width) -- same as 'density' in matplotlib/numpy
+    """
+    integral = np.sum(content)
+    if integral==0: return np.ones_like(np.asarray(content,dtype=np.float64))
+    return 1./(integral*np.diff(bins))
+
 def dummy_bins2D(x_bins,y_bins):
     """Convert two lists of values, e.g., bin midpoints, into array of values"""
     xbins  = x_bins.repeat(len(y_bins))
@@ -1,6 +1,6 @@
 """
 Created:        17 October   2018
-Last Updated:   19 October   2018
+Last Updated:   18 October   2026
 
 Dan Marley
 daniel.edison.marley@cernSPAMNOT.ch
@@ -8,12 +8,31 @@ daniel.edison.marley@cernSPAMNOT.ch
 
 Simple functions to help accessing data with uproot / numpy
 """
+import re
 import numpy as np
 import tools
 from hist import Hist
 from baseIO import BaseIO
 
 
+
+def tree_branches(tree,expressions):
+    """Names of the branches used in a list of expressions (only these are read)"""
+    names = set()
+    for expression in expressions:
+        if not isinstance(expression,basestring): continue
+        names.update( re.findall(r"[A-Za-z_][A-Za-z0-9_]*",expression) )
+
+    keys = [k.decode('utf-8') if isinstance(k,bytes) else k for k in tree.keys()]
+
+    return [k for k in keys if k in names]
+
+
+def evaluate(expression,arrays):
+    """Evaluate an expression of branches, e.g., 'jet_pt/1000.', with numpy as 'np'"""
+    return eval(expression,{'np':np,'__builtins__':{}},arrays)
+
+
 class UprootIO(BaseIO):
     def __init__(self,**kwargs):
         BaseIO.__init__(self,**kwargs)
@@ -30,7 +49,17 @@ class UprootIO(BaseIO):
         # - throws NotImplementedError (/.../uproot/rootio.py", line 645)
 
         h_data = Hist()
-        if self._isHistogram:
+        if 'TTree' in classname:
+            weight = self.weights if isinstance(self.weights,basestring) else None
+            h_data = self.tree2data(data,self.expression,selection=self.selection,weight=weight,
+                                    entrystart=self.entrystart,entrystop=self.entrystop,
+                                    entrysteps=self.entrysteps)
+            self._isHistogram = True
+            if self.rebin is not None:
+                if h_data.is2D(): h_data.Rebin2D(self.rebin)
+                else:             h_data.Rebin(self.rebin)
+            if self.normed: h_data.density()   # same as arrays
+        elif self._isHistogram:
             if self.dimensions==1:
                 h_data = self.hist2data(data,reBin=self.rebin,normed=self.normed)
             else:
@@ -44,6 +73,95 @@ class UprootIO(BaseIO):
         return h_data
 
 
+    def open_file(self,path):
+        """Open a ROOT file with uproot"""
+        import uproot
+        return uproot.open(path)
+
+    def close_file(self,handle):
+        close = getattr(handle,'close',None)
+        if close is not None: close()
+
+    def get_object(self,handle,name):
+        return handle[name]
+
+
+    def tree2data(self,tree,expression,selection=None,weight=None,binning=None,
+                  entrystart=None,entrystop=None,entrysteps=100000):
+        """
+        Histogram an expression of TTree branches, reading the tree in chunks.
+        Only the branches used in the expression(s), selection and weight are read,
+        and each chunk is filled into the histogram before the next one is read,
+        so memory use does not depend on the size of the tree.
+
+        @param expression    expression of branches, e.g., "jet_pt/1000." 
+                             (list of two expressions for 2D histograms; ValueError otherwise)
+        @param selection     boolean expression to select entries, e.g., "(njets>=4) & (ht>500)"
+        @param weight        branch name (or expression) for the weights
+        @param binning       bin edges (default: self.binning); integer binning
+                             needs an extra pass over the tree to find the range
+        @param entrystart    first entry to read
+        @param entrystop     last entry to read (exclusive)
+        @param entrysteps    number of entries per chunk
+        """
+        if binning is None: binning = self.binning
+
+        if self.dimensions==1:
+            valid = isinstance(expression,basestring)
+        else:
+            valid = isinstance(expression,(list,tuple)) and len(expression)==2 and \
+                    all(isinstance(e,basestring) for e in expression)
+        if not valid:
+            raise ValueError("Cannot histogram a TTree with expression {0!r}: use a string of branches "
+                             "for 1D, e.g., 'jet_pt/1000.', and a list of two strings for 2D, "
+                             "e.g., ['jet_eta','jet_phi']".format(expression))
+
+        expressions = [expression] if self.dimensions==1 else list(expression)
+        branches    = tree_branches(tree,expressions+[selection,weight])
+
+        def chunks():
+            """Generator of (values,weights) for each chunk of the tree"""
+            for arrays in tree.iterate(branches,entrystart=entrystart,entrystop=entrystop,
+                                       entrysteps=entrysteps,namedecode='utf-8'):
+                values  = [evaluate(e,arrays) for e in expressions]
+                weights = None if weight is None else evaluate(weight,arrays)
+
+                if selection is not None:
+                    mask    = evaluate(selection,arrays)
+                    values  = [v[mask] for v in values]
+                    weights = None if weights is None else weights[mask]
+
+                counts = getattr(values[0],'counts',None)    # jagged arrays (several values per entry)
+                if counts is not None:
+                    values  = [v.flatten() for v in values]
+                    weights = None if weights is None else np.repeat(weights,counts)
+
+                yield values,weights
+
+        # integer binning: find the range of the data first
+        if self.dimensions==1: binning = [binning]
+        binning = list(binning) if not isinstance(binning,(int,long)) else [binning]*self.dimensions
+        if any(isinstance(b,(int,long)) for b in binning):
+            lo = [np.inf]*self.dimensions
+            hi = [-np.inf]*self.dimensions
+            for values,weights in chunks():
+                for i,v in enumerate(values):
+                    v = np.asarray(v)
+                    v = v[np.isfinite(v)]
+                    if not v.size: continue
+                    lo[i] = min(lo[i],np.min(v))
+                    hi[i] = max(hi[i],np.max(v))
+            binning = [tools.bin_edges(np.array([lo[i],hi[i]]),b) if isinstance(b,(int,long)) else b
+                       for i,b in enumerate(binning)]
+
+        results = Hist(binning[0] if self.dimensions==1 else {'x':binning[0],'y':binning[1]})
+        for values,weights in chunks():
+            results.fill(values[0] if self.dimensions==1 else values,weights=weights)
+
+        return results
+
+
+
     def hist2data(self,histo,reBin=None,normed=False):
         """Convert ROOT histogram for internal use."""
         bin_contents,bin_edges = histo.numpy()
@@ -55,9 +173,10 @@ class UprootIO(BaseIO):
         results.width   = tools.widths(bin_edges)
 
         if len(histo.variances)>0:
-            results.error = histo.variances
+            results.sumw2 = np.asarray(histo.variances)
         else:
-            results.error = np.sqrt( bin_contents )
+            results.sumw2 = np.asarray(bin_contents,dtype=np.float64)
+        results.error = np.sqrt(results.sumw2)
 
         if reBin is not None:
             results.Rebin(reBin)
@@ -73,16 +192,17 @@ class UprootIO(BaseIO):
         bin_contents = bin_contents.T
 
         if len(histo.allvariances)>0:
-            bin_errors = histo.allvariances[1:-1,1:-1]  # variances() doesn't produce correct values in 2D right now
+            bin_sumw2 = histo.allvariances[1:-1,1:-1].T  # variances() doesn't produce correct values in 2D right now
         else:
-            bin_errors = np.sqrt(bin_contents)
+            bin_sumw2 = bin_contents
 
         xbin_centers,ybin_centers = tools.dummy_bins2D(tools.midpoints(xbin_edges),tools.midpoints(ybin_edges))
         xbin_widths,ybin_widths   = tools.dummy_bins2D(tools.widths(xbin_edges),tools.widths(ybin_edges))
 
         results = Hist()
         results.content = bin_contents.flatten()
-        results.error   = bin_errors.flatten()
+        results.sumw2   = np.asarray(bin_sumw2,dtype=np.float64).flatten()
+        results.error   = np.sqrt(results.sumw2)
         results.bins    = {'x':xbin_edges,  'y':ybin_edges}
         results.center  = {'x':xbin_centers,'y':ybin_centers}
         results.width   = {'x':xbin_widths, 'y':ybin_widths}
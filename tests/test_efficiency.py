@@ -0,0 +1,70 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Checks of efficiencies computed without ROOT: passed & total fills of
+unbinned values, weighted (effective) counts, re-binning, and the pass mask.
+
+From the top directory:
+  python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','python'))
+
+import hist
+import baseIO
+import intervals
+
+
+
+class TestEfficiency(unittest.TestCase):
+    """Efficiencies of unbinned values with a pass mask"""
+    def setUp(self):
+        self.rng    = np.random.RandomState(7)
+        self.data   = self.rng.uniform(0,1,5000)
+        self.passed = self.rng.uniform(size=self.data.size)<self.data
+
+    def test_fill(self):
+        """Passed & total histograms filled in one pass, compared to numpy.histogram"""
+        bins    = np.linspace(0,1,11)
+        weights = self.rng.uniform(0.5,1.5,self.data.size)
+        (p,p_sumw2),(t,t_sumw2) = hist.fill_efficiency(self.data,self.passed,bins,weights=weights)
+        np.testing.assert_allclose(p,np.histogram(self.data[self.passed],bins=bins,weights=weights[self.passed])[0],rtol=1e-12)
+        np.testing.assert_allclose(t,np.histogram(self.data,bins=bins,weights=weights)[0],rtol=1e-12)
+
+    def test_effective_counts(self):
+        """Weighted counts are scaled by sum(w)/sum(w^2) of the total"""
+        passed,total = intervals.effective_counts([2.,0.],[4.,0.],[8.,0.])
+        np.testing.assert_allclose(passed,[1.,0.])
+        np.testing.assert_allclose(total,[2.,0.])
+
+    def test_rebin(self):
+        """Re-binning the passed & total histograms is the same as filling coarse bins"""
+        io   = baseIO.BaseIO()
+        fine = io.array2efficiency(self.data,self.passed,binning=np.linspace(0,1,21),reBin=4)
+        ref  = io.array2efficiency(self.data,self.passed,binning=np.linspace(0,1,6))
+        np.testing.assert_allclose(fine.bins,ref.bins,rtol=1e-12)
+        np.testing.assert_allclose(fine.content,ref.content,rtol=1e-12)
+        np.testing.assert_allclose(fine.error,ref.error,rtol=1e-12)
+
+    def test_passed(self):
+        """'passed' must be a boolean array with one value per entry"""
+        io = baseIO.BaseIO()
+        for passed in [None,self.passed[:-1],self.passed.astype(int)]:
+            self.assertRaises(ValueError,io.array2efficiency,self.data,passed,binning=10)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+## THE END ##
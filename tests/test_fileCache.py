@@ -0,0 +1,108 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Checks of the file cache: keys of the conversion options
+and least-recently-used eviction of files and histograms.
+
+From the top directory:
+  python -m unittest discover tests
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','python'))
+
+import fileCache
+from hist import Hist
+
+
+
+class TestFileCache(unittest.TestCase):
+    """Keys and least-recently-used eviction of the file cache"""
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths  = []
+        for i in range(3):
+            path = os.path.join(self.tmpdir,'f{0}.root'.format(i))
+            open(path,'w').close()
+            self.paths.append(path)
+        self.closed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_option_key(self):
+        key = fileCache.option_key
+        self.assertEqual(key(np.arange(3.)),key(np.arange(3.)))
+        self.assertNotEqual(key(np.arange(3.)),key(np.arange(1,4.)))
+        self.assertEqual(key('weight'),'weight')
+        self.assertEqual(key({'x':[0,1],'y':[0,2]}),key({'y':[0,2],'x':[0,1]}))
+        # repr() truncates large arrays: these differ in the middle
+        a = np.ones(5000)
+        b = a.copy()
+        b[2500] = 2.
+        self.assertNotEqual(key(a),key(b))
+
+    def test_file_eviction(self):
+        cache = fileCache.FileCache(max_files=2)
+        for path in self.paths[:2]:
+            cache.get_file('test',path,lambda p: p,self.closed.append)
+        cache.get_file('test',self.paths[0],lambda p: p,self.closed.append)   # most recently used
+        cache.get_file('test',self.paths[2],lambda p: p,self.closed.append)
+        self.assertEqual(self.closed,[self.paths[1]])
+        self.assertEqual(list(cache.files),[('test',self.paths[0]),('test',self.paths[2])])
+
+    def test_file_modified(self):
+        """A file that changed on disk is closed and re-opened"""
+        cache  = fileCache.FileCache()
+        opened = []
+        def open_file(path):
+            opened.append(path)
+            return path
+        cache.get_file('test',self.paths[0],open_file,self.closed.append)
+        cache.get_file('test',self.paths[0],open_file,self.closed.append)
+        self.assertEqual(len(opened),1)
+        mtime = os.path.getmtime(self.paths[0])
+        os.utime(self.paths[0],(mtime+10,mtime+10))
+        cache.get_file('test',self.paths[0],open_file,self.closed.append)
+        self.assertEqual(len(opened),2)
+        self.assertEqual(self.closed,[self.paths[0]])
+
+    def test_hist_eviction(self):
+        histo  = Hist(np.linspace(0,1,101))
+        nbytes = fileCache.hist_nbytes(histo)
+        cache  = fileCache.FileCache(max_memory=2*nbytes)
+        for key in ['a','b']:
+            cache.put_hist(key,histo)
+        cache.get_hist('a')                       # most recently used
+        cache.put_hist('c',histo)
+        self.assertEqual(list(cache.hists),['a','c'])
+        self.assertEqual(cache.memory,2*nbytes)
+        self.assertEqual(cache.get_hist('b'),(None,None))
+
+    def test_hist_copy(self):
+        """Cached histograms are copies: changing a returned Hist doesn't change the cache"""
+        cache = fileCache.FileCache()
+        histo = Hist(np.linspace(0,1,5)).fill([0.1])
+        cache.put_hist('a',histo)
+        histo.content[0] = 10.
+        cached,flags = cache.get_hist('a')
+        cached.content[0] = 20.
+        self.assertEqual(cache.get_hist('a')[0].content[0],1.)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+## THE END ##
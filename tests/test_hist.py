@@ -0,0 +1,158 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Checks of the Hist engine against numpy.histogram/histogram2d:
+fills (uniform, log-uniform & other binnings, 2D, chunks), densities, and re-binning.
+
+From the top directory:
+  python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','python'))
+
+import hist
+import baseIO
+from hist import Hist
+
+
+
+class TestFill(unittest.TestCase):
+    """Fills of the Hist engine compared to numpy.histogram/histogram2d"""
+    def setUp(self):
+        self.rng     = np.random.RandomState(42)
+        self.data    = self.rng.normal(0.5,0.3,20000)
+        self.weights = self.rng.uniform(0.5,1.5,self.data.size)
+
+    def check_1D(self,data,bins,weights=None):
+        content,sumw2 = hist.fill1D(data,bins,weights=weights)
+        ref,_ = np.histogram(data,bins=bins,weights=weights)
+        ref_sumw2,_ = np.histogram(data,bins=bins,weights=None if weights is None else np.square(weights))
+        np.testing.assert_allclose(content,ref,rtol=1e-12)
+        np.testing.assert_allclose(sumw2,ref_sumw2,rtol=1e-12)
+
+    def test_uniform(self):
+        self.check_1D(self.data,np.linspace(0,1,21))
+        self.check_1D(self.data,np.linspace(-0.3,1.1,57),weights=self.weights)
+
+    def test_log_uniform(self):
+        self.check_1D(np.abs(self.data)+1e-3,np.logspace(-3,0.5,31),weights=self.weights)
+
+    def test_non_uniform(self):
+        self.check_1D(self.data,np.array([-1.,0.,0.1,0.35,0.5,0.9,2.]),weights=self.weights)
+
+    def test_edges(self):
+        """Values on the edges (incl. the last edge), outside the binning, and NaN"""
+        bins = np.linspace(0,1,11)
+        data = np.concatenate([bins,bins+1e-12,bins-1e-12,[-5.,5.,np.nan,np.inf,-np.inf]])
+        content,sumw2 = hist.fill1D(data,bins)
+        ref,_ = np.histogram(data[np.isfinite(data)],bins=bins)
+        np.testing.assert_array_equal(content,ref)
+
+    def test_2D(self):
+        y = self.rng.normal(0.,1.,self.data.size)
+        xbins = np.linspace(0,1,11)
+        ybins = np.array([-3.,-1.,0.,0.5,3.])
+        content,sumw2 = hist.fill2D(self.data,y,xbins,ybins,weights=self.weights)
+        ref,_,_ = np.histogram2d(self.data,y,bins=[xbins,ybins],weights=self.weights)
+        ref_sumw2,_,_ = np.histogram2d(self.data,y,bins=[xbins,ybins],weights=np.square(self.weights))
+        np.testing.assert_allclose(content.reshape(10,4),ref,rtol=1e-12)
+        np.testing.assert_allclose(sumw2.reshape(10,4),ref_sumw2,rtol=1e-12)
+
+    def test_density(self):
+        """'normed' arrays are a density (numpy 'density'), not re-scaled when drawn"""
+        bins = np.array([-1.,0.,0.1,0.35,0.5,0.9,2.])
+        h = baseIO.BaseIO().array2data(self.data,weights=self.weights,normed=True,binning=bins)
+        ref,_ = np.histogram(self.data,bins=bins,weights=self.weights,density=True)
+        np.testing.assert_allclose(h.content,ref,rtol=1e-12)
+        self.assertTrue(h.isDensity)
+        np.testing.assert_allclose(h.error,np.sqrt(h.sumw2),rtol=1e-12)
+
+        y = self.rng.normal(0.,1.,self.data.size)
+        h = baseIO.BaseIO().array2data2D([self.data,y],normed=True,binning=[bins,bins])
+        ref,_,_ = np.histogram2d(self.data,y,bins=[bins,bins],normed=True)
+        np.testing.assert_allclose(h.content.reshape(6,6),ref,rtol=1e-12)
+
+    def test_chunks(self):
+        """Filling in chunks gives the same histogram as one fill"""
+        bins  = np.linspace(0,1,21)
+        whole = Hist(bins).fill(self.data,weights=self.weights)
+        parts = Hist(bins).fill_chunks(np.array_split(self.data,7),weights=np.array_split(self.weights,7))
+        np.testing.assert_allclose(parts.content,whole.content,rtol=1e-12)
+        np.testing.assert_allclose(parts.sumw2,whole.sumw2,rtol=1e-12)
+
+
+
+class TestRebin(unittest.TestCase):
+    """Re-binning (merge_bins) compared to filling the coarse binning directly"""
+    def setUp(self):
+        rng = np.random.RandomState(7)
+        self.x = rng.uniform(0,1,10000)
+        self.y = rng.uniform(0,1,10000)
+        self.w = rng.uniform(0.5,1.5,10000)
+        self.bins = np.linspace(0,1,25)
+
+    def test_factor(self):
+        h = Hist(self.bins).fill(self.x,weights=self.w)
+        h.Rebin(4)
+        ref,_ = np.histogram(self.x,bins=self.bins[::4],weights=self.w)
+        ref_sumw2,_ = np.histogram(self.x,bins=self.bins[::4],weights=np.square(self.w))
+        np.testing.assert_allclose(h.content,ref,rtol=1e-12)
+        np.testing.assert_allclose(h.sumw2,ref_sumw2,rtol=1e-12)
+        np.testing.assert_allclose(h.error,np.sqrt(ref_sumw2),rtol=1e-12)
+
+    def test_leftover(self):
+        """A factor that doesn't divide the number of bins drops the bins above the last group"""
+        h = Hist(self.bins).fill(self.x,weights=self.w)
+        h.Rebin(5)
+        new_bins = self.bins[:21:5]
+        keep  = self.x<=new_bins[-1]
+        ref,_ = np.histogram(self.x[keep],bins=new_bins,weights=self.w[keep])
+        np.testing.assert_allclose(h.content,ref,rtol=1e-12)
+        np.testing.assert_array_equal(h.bins,new_bins)
+
+    def test_edges(self):
+        """Non-uniform subset of the edges; bins above the last new edge are dropped"""
+        new_bins = self.bins[[0,1,5,6,12,20]]
+        h = Hist(self.bins).fill(self.x,weights=self.w)
+        h.Rebin(new_bins)
+        ref,_ = np.histogram(self.x[self.x<=new_bins[-1]],bins=new_bins,weights=self.w[self.x<=new_bins[-1]])
+        np.testing.assert_allclose(h.content,ref,rtol=1e-12)
+        np.testing.assert_array_equal(h.bins,new_bins)
+
+    def test_tolerance(self):
+        """New edges are matched to the existing edges within a tolerance (e.g., 0.1 vs 1/10)"""
+        new_bins = self.bins[[0,6,12,24]]
+        h = Hist(self.bins).fill(self.x,weights=self.w)
+        h.Rebin(new_bins+np.array([0.,1e-9,-1e-9,0.]))
+        ref,_ = np.histogram(self.x,bins=new_bins,weights=self.w)
+        np.testing.assert_allclose(h.content,ref,rtol=1e-12)
+        np.testing.assert_array_equal(h.bins,new_bins)
+
+    def test_2D(self):
+        ybins = np.linspace(0,1,13)
+        h = Hist({'x':self.bins,'y':ybins}).fill([self.x,self.y],weights=self.w)
+        h.Rebin2D(3)
+        ref,_,_ = np.histogram2d(self.x,self.y,bins=[self.bins[::3],ybins[::3]],weights=self.w)
+        np.testing.assert_allclose(h.content.reshape(ref.shape),ref,rtol=1e-12)
+
+        h = Hist({'x':self.bins,'y':ybins}).fill([self.x,self.y],weights=self.w)
+        h.Rebin2D({'x':self.bins[[0,6,24]],'y':ybins[[0,1,12]]})
+        ref,_,_ = np.histogram2d(self.x,self.y,bins=[self.bins[[0,6,24]],ybins[[0,1,12]]],weights=self.w)
+        np.testing.assert_allclose(h.content.reshape(ref.shape),ref,rtol=1e-12)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+## THE END ##
@@ -0,0 +1,82 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Checks of the efficiency intervals (TEfficiency conventions)
+against scipy.stats.beta and closed-form values.
+
+From the top directory:
+  python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','python'))
+
+import intervals
+
+try:
+    import scipy.stats
+    has_scipy = True
+except ImportError:
+    has_scipy = False
+
+
+
+class TestIntervals(unittest.TestCase):
+    """Efficiency intervals (TEfficiency conventions)"""
+    def setUp(self):
+        self.total  = np.array([1.,10.,10.,10.,50.,200.])
+        self.passed = np.array([0.,0.,3.,10.,25.,199.])
+        self.level  = intervals.default_level
+        self.tail   = 0.5*(1.-self.level)
+
+    def test_normal_quantile(self):
+        self.assertAlmostEqual(intervals.normal_quantile(intervals.default_level),1.,places=9)
+        self.assertAlmostEqual(intervals.normal_quantile(0.95),1.959963984540054,places=9)
+
+    @unittest.skipUnless(has_scipy,"scipy is needed for the beta distribution")
+    def test_clopper_pearson(self):
+        k,n = self.passed,self.total
+        eff,down,up = intervals.efficiency(k,n,method='clopper_pearson')
+        lower = np.where(k>0,scipy.stats.beta.ppf(self.tail,k,n-k+1),0.)
+        upper = np.where(k<n,scipy.stats.beta.ppf(1-self.tail,k+1,n-k),1.)
+        np.testing.assert_allclose(eff-down,lower,atol=1e-10)
+        np.testing.assert_allclose(eff+up,upper,atol=1e-10)
+
+    @unittest.skipUnless(has_scipy,"scipy is needed for the beta distribution")
+    def test_clopper_pearson_closed_form(self):
+        """No passed (or all passed) events: upper (lower) limit is 1-tail^(1/n) (tail^(1/n))"""
+        n = np.array([1.,5.,20.])
+        lower,upper = intervals.clopper_pearson(np.zeros(3),n)
+        np.testing.assert_allclose(upper,1-self.tail**(1./n),rtol=1e-10)
+        lower,upper = intervals.clopper_pearson(n,n)
+        np.testing.assert_allclose(lower,self.tail**(1./n),rtol=1e-10)
+
+    @unittest.skipUnless(has_scipy,"scipy is needed for the beta distribution")
+    def test_jeffreys(self):
+        k,n = self.passed,self.total
+        eff,down,up = intervals.efficiency(k,n,method='jeffreys')
+        np.testing.assert_allclose(eff,(k+0.5)/(n+1.),rtol=1e-12)
+        np.testing.assert_allclose(eff-down,scipy.stats.beta.ppf(self.tail,k+0.5,n-k+0.5),atol=1e-10)
+        np.testing.assert_allclose(eff+up,scipy.stats.beta.ppf(1-self.tail,k+0.5,n-k+0.5),atol=1e-10)
+
+    def test_wilson(self):
+        """Reference values of the Wilson score interval (z=1)"""
+        lower,upper = intervals.wilson(np.array([0.,5.,9.]),np.array([10.,10.,10.]))
+        np.testing.assert_allclose(lower,[0.,0.349244,0.766147],atol=1e-6)
+        np.testing.assert_allclose(upper,[1./11,0.650756,0.961126],atol=1e-6)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+## THE END ##
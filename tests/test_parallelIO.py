@@ -0,0 +1,44 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Checks of merging the partial histograms of many files (parallelIO).
+
+From the top directory:
+  python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','python'))
+
+import parallelIO
+from hist import Hist
+
+
+
+class TestMerge(unittest.TestCase):
+    """Merging partial histograms (parallelIO)"""
+    def test_merge(self):
+        bins = np.linspace(0,1,5)
+        total = parallelIO.merge([Hist(bins).fill([0.1,0.6]),Hist(bins).fill([0.6],weights=[2.])])
+        np.testing.assert_allclose(total.content,[1.,0.,3.,0.])
+        np.testing.assert_allclose(total.sumw2,[1.,0.,5.,0.])
+
+    def test_different_binning(self):
+        hists = [Hist(np.linspace(0,1,5)),Hist(np.linspace(0,2,5))]
+        self.assertRaises(ValueError,parallelIO.merge,hists)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+## THE END ##
@@ -0,0 +1,55 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Checks of the ratios and their uncertainties (TH1::Divide conventions).
+
+From the top directory:
+  python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','python'))
+
+import ratios
+
+
+
+class TestRatios(unittest.TestCase):
+    """Ratios and their uncertainties"""
+    def test_binomial(self):
+        """TH1::Divide(...,"B") for unweighted counts: sqrt(r(1-r)/n)"""
+        k = np.array([0.,3.,10.,7.])
+        n = np.array([10.,10.,10.,0.])
+        content,error,mask = ratios.divide(k,n,np.sqrt(k),np.sqrt(n),errors='binomial')
+        np.testing.assert_array_equal(mask[0],[False,False,False,True])
+        r = k[:3]/n[:3]
+        np.testing.assert_allclose(content[0,:3],r)
+        np.testing.assert_allclose(error[0,:3],np.sqrt(r*(1-r)/n[:3]),atol=1e-12)
+        self.assertTrue(np.isnan(content[0,3]) and np.isnan(error[0,3]))
+
+    def test_both(self):
+        """Uncorrelated uncertainties add in quadrature (relative)"""
+        content,error,mask = ratios.divide([[4.,9.]],[[2.,3.]],[[1.,1.]],[[0.5,1.]],errors='both')
+        np.testing.assert_allclose(error,content*np.sqrt(np.square([1/4.,1/9.])+np.square([0.5/2,1/3.])))
+
+    def test_significance(self):
+        content,error,mask = ratios.divide([2.,3.],[4.,0.],[1.,1.],value='significance')
+        np.testing.assert_allclose(content[0,0],1.)
+        np.testing.assert_allclose(error[0,0],0.5)
+        self.assertTrue(mask[0,1])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+## THE END ##
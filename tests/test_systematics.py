@@ -0,0 +1,47 @@
+"""
+Created:        18 October   2026
+Last Updated:   18 October   2026
+
+Dan Marley
+daniel.edison.marley@cernSPAMNOT.ch
+-----
+
+Checks of the combination of systematic variations (correlations & envelopes).
+
+From the top directory:
+  python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','python'))
+
+import systematics
+
+
+
+class TestSystematics(unittest.TestCase):
+    """Combination of the systematic variations"""
+    def test_correlation(self):
+        shift = np.array([[[1.,2.]],[[3.,0.]]])         # 2 samples x 1 nuisance x 2 bins
+        down,up = systematics.uncertainty(shift,correlated=True)
+        np.testing.assert_allclose(up,[4.,2.])          # linear sum over samples
+        down,up = systematics.uncertainty(shift,correlated=False)
+        np.testing.assert_allclose(up,[np.sqrt(10.),2.])  # quadrature sum over samples
+
+    def test_envelope(self):
+        shift_up   = np.array([[[1.,-2.],[0.5,0.]]])    # 1 sample x 2 nuisances x 2 bins
+        shift_down = np.array([[[-1.,1.],[0.,0.]]])
+        down,up = systematics.uncertainty(shift_up,shift_down,method='envelope')
+        np.testing.assert_allclose(up,[np.sqrt(1.25),1.])
+        np.testing.assert_allclose(down,[1.,2.])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+## THE END ##